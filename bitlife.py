@@ -0,0 +1,173 @@
+#===============================================================================
+# bitlife.py
+#
+# Bitboard engine for Conway's Game of Life.
+#
+# The universe is held as NX row words of NY bits each, word x holding cells
+# (x, 0) to (x, NY-1) in bits 0 to NY-1. The words are packed end to end into
+# a single integer, which is the same value as the universe ID:
+#
+#       bit (x*NY + y) = cell (x, y)
+#
+# A generation is computed for all cells at once with shifts and full-adder
+# logic on the packed integer, so it costs a few dozen integer operations
+# instead of 256 neighbor counts. The rule is applied to the bit planes of
+# the neighbor count with logic compiled from the rulestring, see liferules.
+#
+# The edges are either a dead border or, with wrap=True, a torus. There is
+# no border in memory, the shifted neighbors are masked or rotated instead.
+#===============================================================================
+
+from liferules import CONWAY, get_rule
+
+NX = 16
+NY = 16
+
+def uni_to_words(uni, nx=NX, ny=NY):
+    """Return row words for (nx+2)x(ny+2) list of lists with border."""
+    words = []
+    for x in xrange(nx):
+        col = uni[x+1]
+        word = 0
+        for y in xrange(ny):
+            if col[y+1]:
+                word |= 1 << y
+        words.append(word)
+    return words
+
+def words_to_uni(words, nx=NX, ny=NY):
+    """Return (nx+2)x(ny+2) list of lists with border for row words."""
+    UU = [[0 for y in xrange(ny+2)] for x in xrange(nx+2)]
+    for x in xrange(nx):
+        word = words[x]
+        col = UU[x+1]
+        for y in xrange(ny):
+            col[y+1] = (word >> y) & 0x01
+    return UU
+
+def pad_words(words, ny=NY, wrap=False, padded=None):
+    """Return words with one cell of border all round, cell y at bit y+1.
+
+    The border is dead, or with wrap the cells from the opposite edge.
+    padded is an optional list of len(words)+2 to fill in place.
+    """
+    if padded is None:
+        padded = [0] * (len(words)+2)
+    if not wrap:
+        for x, word in enumerate(words):
+            padded[x+1] = word << 1
+        padded[0] = padded[-1] = 0
+        return padded
+    mask = (1 << (ny+3)) - 1
+    for x, word in enumerate(words):
+        padded[x+1] = ((word << 1) | (word >> (ny-1)) | (word << (ny+1))) & mask
+    padded[0] = padded[-2]
+    padded[-1] = padded[1]
+    return padded
+
+def words_to_id(words, ny=NY):
+    """Return universe ID for row words."""
+    ID = 0
+    for x, word in enumerate(words):
+        ID |= word << (x*ny)
+    return ID
+
+def id_to_words(ID, nx=NX, ny=NY, words=None):
+    """Return row words for universe ID.
+
+    words is an optional list of nx to fill in place.
+    """
+    mask = (1 << ny) - 1
+    if words is None:
+        return [(ID >> (x*ny)) & mask for x in xrange(nx)]
+    for x in xrange(nx):
+        words[x] = (ID >> (x*ny)) & mask
+    return words
+
+class BitLife():
+    """Bitboard Game of Life engine."""
+
+    def __init__(self, nx=NX, ny=NY, rule=CONWAY, wrap=False):
+        self.nx = nx
+        self.ny = ny
+        self.wrap = wrap
+        self.rule = get_rule(rule)
+        self.bitlogic = self.rule.bitlogic
+        self.state = 0
+        self.full = (1 << (nx*ny)) - 1
+        first = 0
+        last = 0
+        for x in xrange(nx):
+            first |= 1 << (x*ny)
+            last |= 1 << (x*ny + ny-1)
+        # masks to stop y shifts leaking into the neighboring word
+        self.first = first
+        self.last = last
+        self.not_first = self.full & ~first
+        self.not_last = self.full & ~last
+
+    def set_universe(self, uni):
+        """Set universe from (nx+2)x(ny+2) list of lists with border."""
+        self.state = words_to_id(uni_to_words(uni, self.nx, self.ny), self.ny)
+
+    def get_universe(self, ):
+        """Return universe as (nx+2)x(ny+2) list of lists with border."""
+        return words_to_uni(self.get_words(), self.nx, self.ny)
+
+    def set_words(self, words):
+        """Set universe from row words."""
+        self.state = words_to_id(words, self.ny)
+
+    def set_id(self, ID):
+        """Set universe from universe ID."""
+        self.state = ID & self.full
+
+    def get_words(self, ):
+        """Return universe as row words."""
+        return id_to_words(self.state, self.nx, self.ny)
+
+    def get_cell(self, x, y):
+        """Return value of cell at x, y."""
+        return (self.state >> (x*self.ny + y)) & 0x01
+
+    def get_id(self, ):
+        """Return unique 2**(nx*ny) bit integer value."""
+        return self.state
+
+    def step(self, ):
+        """Life goes on."""
+        ny = self.ny
+        b = self.state
+        # neighbors above and below in the same word
+        u = (b << 1) & self.not_first
+        d = (b >> 1) & self.not_last
+        if self.wrap:
+            u |= (b >> (ny-1)) & self.first
+            d |= (b << (ny-1)) & self.last
+        # 2 bit sum of the 3 cell column and of the 2 cell column
+        c0 = u ^ b ^ d
+        c1 = (u & b) | (d & (u ^ b))
+        m0 = u ^ d
+        m1 = u & d
+        # columns from the neighboring words
+        l0 = (c0 << ny) & self.full
+        l1 = (c1 << ny) & self.full
+        r0 = c0 >> ny
+        r1 = c1 >> ny
+        if self.wrap:
+            edge = (self.nx-1)*ny
+            l0 |= c0 >> edge
+            l1 |= c1 >> edge
+            r0 |= (c0 << edge) & self.full
+            r1 |= (c1 << edge) & self.full
+        # add the three 2 bit sums, count = z0 + 2*h0 + 4*h1 + 8*h2
+        z0 = l0 ^ r0 ^ m0
+        k0 = (l0 & r0) | (m0 & (l0 ^ r0))
+        p = l1 ^ r1 ^ m1
+        q = (l1 & r1) | (m1 & (l1 ^ r1))
+        h0 = p ^ k0
+        e = p & k0
+        h1 = q ^ e
+        h2 = q & e
+        # for B3/S23 this is h0 & ~h1 & ~h2 & (z0 | b)
+        self.state = self.bitlogic(b, z0, h0, h1, h2) & self.full
\ No newline at end of file
@@ -0,0 +1,57 @@
+#===============================================================================
+# cycledetector.py
+#
+# Detect still lifes and oscillators from a stream of universe IDs.
+#
+# The last max_period IDs are kept in a dict mapping ID to the generation it
+# was last seen, plus a deque giving the order to forget them in. Checking a
+# new ID is a single dict lookup, and the period is the difference of the two
+# generations, so there is no scan over the history.
+#===============================================================================
+from collections import deque
+
+MAX_PERIOD = 1000   # longest period that can be detected
+
+class CycleDetector():
+    """Track universe IDs and report period and transient of any cycle."""
+
+    def __init__(self, max_period=MAX_PERIOD):
+        self.max_period = max_period
+        self.seen = {}
+        self.order = deque()
+        self.reset()
+
+    def reset(self, ID=None, generation=1):
+        """Forget all history and optionally start with given ID."""
+        self.seen.clear()
+        self.order.clear()
+        self.start = generation
+        self.period = 0
+        self.transient = 0
+        if ID is not None:
+            self.__add(ID, generation)
+
+    def __add(self, ID, generation):
+        """Remember ID, forgetting the oldest one if over the limit."""
+        self.seen[ID] = generation
+        self.order.append((ID, generation))
+        if len(self.order) > self.max_period:
+            old, gen = self.order.popleft()
+            if self.seen.get(old) == gen:
+                del self.seen[old]
+
+    def update(self, ID, generation):
+        """Record ID for generation. Return period if ID is a repeat, else 0.
+
+        On the first repeat, period and transient (generations before the
+        cycle was entered) are also stored on the detector.
+        """
+        last = self.seen.get(ID)
+        period = 0
+        if last is not None:
+            period = generation - last
+            if not self.period:
+                self.period = period
+                self.transient = last - self.start
+        self.__add(ID, generation)
+        return period
\ No newline at end of file
@@ -0,0 +1,88 @@
+#===============================================================================
+# framering.py
+#
+# Bounded buffer of frames between the simulation and the display.
+#
+# In GOL's ahead mode the simulation runs up to size generations ahead of
+# what is shown. The producer waits for room before each step and the render
+# stage takes frames at its own pace, so a slow I2C write or knob read no
+# longer holds up the simulation, and a slow generation is covered by the
+# frames already made.
+#
+# clear() empties the ring at once. A frame made from before a clear() is
+# dropped by put(), so nothing stale is shown after a new universe is set.
+#
+# wake() ends any wait of either side, for pause and kill. A wake is kept
+# until the side it was meant for next waits, so none are lost.
+#===============================================================================
+import threading
+from collections import deque
+
+SIZE = 16   # generations computed ahead
+
+class FrameRing():
+    """Bounded FIFO of frames for one producer and one consumer thread."""
+
+    def __init__(self, size=SIZE):
+        self.size = size
+        self.frames = deque()
+        self.epoch = 0              # bumped by clear()
+        self.cond = threading.Condition()
+        self.wake_producer = False
+        self.wake_consumer = False
+
+    def wake(self, ):
+        """End any wait_room(), idle() or get() now."""
+        with self.cond:
+            self.wake_producer = True
+            self.wake_consumer = True
+            self.cond.notify_all()
+
+    def clear(self, ):
+        """Drop all frames, and any being made now."""
+        with self.cond:
+            self.epoch += 1
+            self.frames.clear()
+            self.cond.notify_all()
+
+    def wait_room(self, ):
+        """Wait for room for a frame. Return False if woken first."""
+        with self.cond:
+            while len(self.frames) >= self.size and not self.wake_producer:
+                self.cond.wait()
+            woken = self.wake_producer
+            self.wake_producer = False
+            return not woken
+
+    def idle(self, timeout):
+        """Producer sleep until woken, or for timeout secs."""
+        with self.cond:
+            if not self.wake_producer:
+                self.cond.wait(timeout)
+            self.wake_producer = False
+
+    def put(self, frame, epoch):
+        """Add frame made since clear number epoch. Return False if dropped."""
+        with self.cond:
+            if epoch != self.epoch:
+                return False
+            self.frames.append(frame)
+            self.cond.notify_all()
+            return True
+
+    def peek(self, ):
+        """Return oldest frame without taking it, or None."""
+        with self.cond:
+            return self.frames[0] if self.frames else None
+
+    def get(self, ):
+        """Return oldest frame, waiting for one. Return None if woken first."""
+        with self.cond:
+            while not self.frames and not self.wake_consumer:
+                self.cond.wait()
+            self.wake_consumer = False
+            if not self.frames:
+                return None
+            frame = self.frames.popleft()
+            self.cond.notify_all()
+            return frame
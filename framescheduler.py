@@ -0,0 +1,66 @@
+#===============================================================================
+# framescheduler.py
+#
+# Frame pacing without busy waiting.
+#
+# Each frame is due one period after the previous one was due, so time spent
+# stepping and rendering comes out of the sleep and the frame rate stays
+# steady. The sleep is done on an Event in short slices so that a change in
+# the rate knob is picked up within POLL seconds, and wake() ends it at once,
+# e.g. on pause or kill.
+#===============================================================================
+import threading
+from time import time
+
+POLL = 0.05     # how often to recheck the period while sleeping (secs)
+IDLE = 1.00     # longest wait in idle() before rechecking (secs)
+
+class FrameScheduler():
+    """Sleep until the next frame is due."""
+
+    def __init__(self, poll=POLL):
+        self.poll = poll
+        self.event = threading.Event()
+        self.last = None
+        self.overshoot = 0.0    # how late the last on time wait() woke (secs)
+
+    def wake(self, ):
+        """End any wait() or idle() now."""
+        self.event.set()
+
+    def reset(self, ):
+        """Start timing again from the next frame."""
+        self.last = None
+
+    def wait(self, period):
+        """Sleep until next frame is due. Return False if woken early.
+
+        period is a function returning the current frame period in secs. It
+        is checked again every poll secs while sleeping.
+        """
+        if self.last is None:
+            self.last = time()
+        while True:
+            p = period()
+            deadline = self.last + p
+            now = time()
+            remaining = deadline - now
+            if remaining <= 0:
+                self.overshoot = -remaining
+                break
+            if self.event.wait(min(remaining, self.poll)):
+                self.event.clear()
+                self.last = time()
+                return False
+        if now - deadline > p:
+            # fell a whole frame behind, don't try to catch up
+            self.last = now
+        else:
+            self.last = deadline
+        return True
+
+    def idle(self, timeout=IDLE):
+        """Sleep until woken, or for timeout secs."""
+        if self.event.wait(timeout):
+            self.event.clear()
+        self.last = None
\ No newline at end of file
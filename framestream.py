@@ -0,0 +1,135 @@
+#===============================================================================
+# framestream.py
+#
+# Live streaming of GOL frames to browsers over a WebSocket.
+#
+# The GOL thread hands each frame to FrameStream.publish(), which never
+# blocks on the network. Frames go into a one slot queue, so an unread frame
+# is replaced by a newer one, and the IOLoop is woken with add_callback(),
+# the one IOLoop call that is safe from another thread. On the IOLoop the
+# newest frame is sent to every viewer. A viewer still busy writing an older
+# frame is marked as behind and sent the newest frame once its write is
+# done, so slow clients skip frames instead of queueing them.
+#
+# Frames are binary messages, little endian:
+#
+#       KEY     B kind=0, I generation, 16 H row words          37 bytes
+#       DELTA   B kind=1, I generation, H mask, H changed words 7+2n bytes
+#
+# Row word x holds cells (x, 0) to (x, 15) in bits 0 to 15, as for
+# Matrix16x16.set_frame(). A delta holds the words that changed since the
+# last frame sent to that viewer, in order, with bit x of mask set for each
+# changed word x. Each viewer starts with a key frame.
+#===============================================================================
+import struct
+from collections import deque
+
+import tornado.ioloop
+import tornado.websocket
+
+KEY     = 0
+DELTA   = 1
+WORDS   = 16        # row words per frame
+
+def frame_words(frame):
+    """Return list of row words for a universe ID, row words or 32 bytes."""
+    if isinstance(frame, (int, long)):
+        return [(frame >> (16*x)) & 0xFFFF for x in xrange(WORDS)]
+    if isinstance(frame, (str, bytearray)):
+        return list(struct.unpack('<{0}H'.format(WORDS), bytes(frame)))
+    return list(frame)
+
+def encode_frame(generation, words, base=None):
+    """Return binary message for row words, a delta against base if given."""
+    generation &= 0xFFFFFFFF
+    if base is not None:
+        mask = 0
+        changed = []
+        for x in xrange(WORDS):
+            if words[x] != base[x]:
+                mask |= 1 << x
+                changed.append(words[x])
+        if len(changed) < WORDS - 1:
+            return struct.pack('<BIH{0}H'.format(len(changed)),
+                               DELTA, generation, mask, *changed)
+    return struct.pack('<BI{0}H'.format(WORDS), KEY, generation, *words)
+
+class FrameStream():
+    """Bridge from the GOL thread to WebSocket viewers on the IOLoop."""
+
+    def __init__(self, ioloop=None):
+        self.ioloop = ioloop or tornado.ioloop.IOLoop.current()
+        self.queue = deque(maxlen=1)
+        self.pending = False
+        self.latest = None      # (generation, row words) last sent out
+        self.viewers = set()
+
+    def publish(self, generation, frame):
+        """Queue frame for the viewers. Safe to call from any thread."""
+        self.queue.append((generation, frame))
+        if not self.pending:
+            self.pending = True
+            self.ioloop.add_callback(self.__flush)
+
+    def __flush(self, ):
+        """Send newest queued frame to all viewers. Runs on the IOLoop."""
+        self.pending = False
+        try:
+            generation, frame = self.queue.popleft()
+        except IndexError:
+            return
+        self.latest = (generation, frame_words(frame))
+        for viewer in list(self.viewers):
+            viewer.send_frame(*self.latest)
+
+    def add_viewer(self, viewer):
+        self.viewers.add(viewer)
+        if self.latest:
+            viewer.send_frame(*self.latest)
+
+    def remove_viewer(self, viewer):
+        self.viewers.discard(viewer)
+
+class FrameSocket(tornado.websocket.WebSocketHandler):
+    """WebSocket handler streaming frames to one viewer."""
+
+    def initialize(self, stream):
+        self.frame_stream = stream
+        self.sent = None        # row words last sent, None until a key frame
+        self.sending = False
+        self.behind = False
+
+    def open(self, ):
+        """Callback for when websocket is opened."""
+        self.frame_stream.add_viewer(self)
+
+    def on_close(self, ):
+        """Callback for when websocket is closed."""
+        self.frame_stream.remove_viewer(self)
+
+    def send_frame(self, generation, words):
+        """Send frame, or if still writing the last one, send it later."""
+        if self.sending:
+            self.behind = True
+            return
+        message = encode_frame(generation, words, self.sent)
+        try:
+            future = self.write_message(message, binary=True)
+        except tornado.websocket.WebSocketClosedError:
+            self.frame_stream.remove_viewer(self)
+            return
+        self.sent = words
+        if future is not None:
+            self.sending = True
+            self.frame_stream.ioloop.add_future(future, self.__written)
+
+    def __written(self, future):
+        """Write done, catch up with the newest frame if behind."""
+        self.sending = False
+        if future.exception() is not None:
+            self.frame_stream.remove_viewer(self)
+        elif self.behind:
+            self.behind = False
+            generation, words = self.frame_stream.latest
+            if words is not self.sent:
+                self.send_frame(generation, words)
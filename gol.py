@@ -13,12 +13,20 @@
 # Carter Nelson
 #===============================================================================
 import threading
-from time import sleep
-from datetime import datetime
-from random import randrange
 from collections import deque
+from random import randrange
+from time import time
 
 from lifedisplay import LifeDisplay
+from liferules import CONWAY
+from cycledetector import CycleDetector
+from framescheduler import FrameScheduler, IDLE
+from framering import FrameRing
+from listlife import ListLife
+from bitlife import BitLife
+from hashlife import HashLife
+from lifecache import CachedLife, TileLife
+from tablelife import TableLife
 
 MIN_RATE        = 0.01  # fastest rate (secs)
 MAX_RATE        = 1.00  # slowest   "    "
@@ -27,30 +35,79 @@ MAX_GENS        = 500   # maximum   "    "    "         "
 MIN_BRIGHTNESS  = 1     # minimum brightness setting
 MAX_BRIGHTNESS  = 15    # maximum    "          "
 PERCENT_FILL    = 50    # universe fill factor
-MAX_HIST        = 20    # maximum history to track universe
+MAX_HIST        = 1000  # maximum history to track universe (longest period)
 MAX_CYCLES      = 20    # maximum cycles for oscillators
 RATE_KNOB       = 0
 GEN_KNOB        = 1
 BRIGHTNESS_KNOB = 2
 ALLOW_INFINITE  = True  # if True, max gen = infinite
+DEFAULT_ENGINE  = 'bit' # stepping engine, see ENGINES
 
-NX = 16
+NX = 16     # default universe size
 NY = 16
+VIEW = 16   # LED matrix size, a window into the universe
+TOGGLE = -1 # edit value that flips a cell
+
+NEXT     = 0 # kinds of frames made ahead: the next generation,
+EDITED   = 1 # the universe as edited, shown even when paused,
+FINISHED = 2 # and the universe is done, pause once shown
+
+CELLS = 0   # kinds of queued edits: a batch of (x, y, value),
+SEED  = 1   # and a new universe, 16x16 or None for random
+
+ENGINES = {
+    'list'  : ListLife,
+    'bit'   : BitLife,
+    'hash'  : HashLife,
+    'cached': CachedLife,
+    'tile'  : TileLife,
+    'table' : TableLife,
+}
+
+try:
+    from numpylife import NumpyLife
+    ENGINES['numpy'] = NumpyLife
+except ImportError:
+    pass  # numpy is optional, only needed off the device
 
 class GOL(threading.Thread):
     """Thread class for running Conway's Game of Life."""
 
-    def __init__(self, uni=None, group=None, target=None, name=None, args=(), kwargs=None):
+    def __init__(self, uni=None, engine=DEFAULT_ENGINE, display=None, stats=None, rule=CONWAY,
+                 nx=NX, ny=NY, wrap=False, metrics=None, ahead=0,
+                 group=None, target=None, name=None, args=(), kwargs=None):
         threading.Thread.__init__(self, group=group, target=target, name=name)
 
-        self.display = LifeDisplay()
-        self.history = deque(maxlen=MAX_HIST)
+        self.nx = nx
+        self.ny = ny
+        self.view = (0, 0)      # top left of LED matrix in universe
+        self.engine = ENGINES[engine](nx, ny, rule=rule, wrap=wrap)
+        if display is None:
+            display = LifeDisplay()
+        self.display = display
+        self.history = CycleDetector(MAX_HIST)
+        self.scheduler = FrameScheduler()
+        self.brightness = None
+        self.fixed_brightness = None    # if set, used instead of the knob
+        self.stats = stats      # lifestats.StatsWriter, or None to not store
+        self.metrics = metrics  # lifemetrics.Metrics, or None to not time
+        # with ahead > 0, generations are made up to ahead frames before they
+        # are shown, and a render thread shows them, see __run_ahead()
+        self.frames = FrameRing(ahead) if ahead else None
+        self.finished = None    # ring epoch in which the universe finished
+        self.frame_listeners = []
+        self.edits = deque()    # (kind, arg) edits from other threads
         self.max_cycles = MAX_CYCLES
         self.threadAlive = False
         self.running = False
         self.autoRestart = False
+        self.throttle = True    # if False, run as fast as possible
+        self.generation = 1
+        self.cycle_count = 0
         if not uni==None:
-            self.U = uni
+            self.engine.set_universe(uni)
+        self.ID = self.__get_universe_id()
+        self.startID = self.ID
         #self.genesis()
 
     def __read_gen_knob(self, ):
@@ -70,156 +127,337 @@ class GOL(threading.Thread):
 
     def __knob_sleep(self, ):
         """Sleep, but also check knob while doing so."""
-        start_wait = datetime.now()
-        while (datetime.now() - start_wait).total_seconds() < self.readRateKnob():
-            pass  # the dutchie on the left hand side
+        if self.throttle:
+            if self.scheduler.wait(self.__read_rate_knob) and self.metrics:
+                self.metrics.add('overshoot', self.scheduler.overshoot)
 
     def __create_world(self, fill):
-        """Let there be light."""
-        UU = [[0 for x in xrange(NX+2)] for y in xrange(NY+2)]
-        for i in xrange(int(0.01 * NX * NY * fill)):
-            x = randrange(1,NX+1)
-            y = randrange(1,NY+1)
-            UU[x][y] = 1
-        return UU
+        """Let there be light. Return universe ID."""
+        ID = 0
+        for i in xrange(int(0.01 * self.nx * self.ny * fill)):
+            x = randrange(1,self.nx+1)
+            y = randrange(1,self.ny+1)
+            ID |= 1 << ((x-1)*self.ny + (y-1))
+        return ID
         
     def __get_universe_id(self, ):
-        """Return unique 2**256 bit integer value."""
-        N = 0;
-        ID = 0;
-        for x in xrange(NX):
-            for y in xrange(NY):
-                ID += self.U[x+1][y+1]*(2**N)
-                N += 1
-        return ID
+        """Return unique 2**(nx*ny) bit integer value."""
+        return self.engine.get_id()
+
+    def __get_view(self, ):
+        """Return row words of the part of the universe the LEDs show."""
+        if self.nx == self.ny == VIEW:
+            return self.ID
+        vx, vy = self.view
+        mask = (1 << min(VIEW, self.ny - vy)) - 1
+        return [(self.ID >> ((vx+x)*self.ny + vy)) & mask
+                for x in xrange(min(VIEW, self.nx - vx))] + \
+               [0] * max(0, VIEW - (self.nx - vx))
 
     def __display_universe(self, ):
         """Show it."""
+        self.show(self.generation, self.__get_view())
+
+    def show(self, generation, frame):
+        """Show frame of generation on the LEDs and to the listeners."""
+        metrics = self.metrics
+        if metrics:
+            t0 = time()
         try:
-            self.display.set_brightness(self.readBrightnessKnob())
-            self.display.clear()
-            for x in xrange(NX):
-                for y in xrange(NY):
-                    self.display.set_pixel(x, y, self.U[x+1][y+1])
+            brightness = self.fixed_brightness or self.__read_brightness_knob()
+            if brightness != self.brightness:
+                self.display.set_brightness(brightness)
+                self.brightness = brightness
+            self.display.set_frame(frame)
+            if metrics:
+                t1 = time()
+                metrics.add('render', t1 - t0)
             self.display.write_display()
+            if metrics:
+                metrics.add('i2c', time() - t1)
         except IOError:
             #print "I2C comm barf. But life goes on!"
-            pass
-
-    def __count_neighbors(self, x, y):
-        """Return neighbor count."""
-        return  self.U[x-1][y-1] + self.U[x][y-1] + self.U[x+1][y-1] + \
-                self.U[x-1][y]   +             self.U[x+1][y]   + \
-                self.U[x-1][y+1] + self.U[x][y+1] + self.U[x+1][y+1]
+            if metrics:
+                metrics.count('i2c_errors')
+        for listener in self.frame_listeners:
+            listener(generation, frame)
 
     def __update_universe(self, ):
         """Life goes on."""
-        #global generation
         self.generation += 1
-        UU = [[0 for x in xrange(NX+2)] for y in xrange(NY+2)]
-        for x in xrange(1,NX+1):
-            for y in xrange(1,NY+1):
-                UU[x][y] = self.U[x][y]
-                N = self.countNeighbors(x,y)
-                if UU[x][y]:
-                    # live cell rules
-                    if N < 2 or N > 3:
-                        UU[x][y] = 0
+        metrics = self.metrics
+        if not metrics:
+            self.engine.step()
+            self.ID = self.__get_universe_id()
+            return
+        t0 = time()
+        self.engine.step()
+        t1 = time()
+        self.ID = self.__get_universe_id()
+        metrics.add('step', t1 - t0)
+        metrics.add('id', time() - t1)
+        metrics.tick()
+
+    def __check_cycles(self, ):
+        """Check for still lifes and oscillators. Return True if the universe
+        is done and was not started over."""
+        ID = self.ID
+        if self.metrics:
+            t0 = time()
+            p = self.history.update(ID, self.generation)
+            self.metrics.add('cycle', time() - t0)
+        else:
+            p = self.history.update(ID, self.generation)
+        if p:
+            # Let it repeat for a few cycles
+            self.cycle_count += 1
+            if not self.max_cycles == 0 and self.cycle_count > self.max_cycles:
+                if ID == 0:
+                    p = 0
+                #print("Oscillator period {0} at generation {1}.").format(p,self.generation)
+
+                # Store stats in database
+                if self.stats:
+                    self.stats.store(self.startID, self.generation, p)
+
+                # Start over
+                if self.autoRestart:
+                    self.__genesis()
                 else:
-                    # dead cell rules
-                    if N == 3:
-                        UU[x][y] = 1
-        return UU
-      
-    def __add_uni_border(self, uni):
-        """Expand 16x16 uni to 18x18 by adding single border of cells."""
-        UU = [[0 for x in xrange(NX+2)] for y in xrange(NY+2)]
-        for x in xrange(1,NX+1):
-            for y in xrange(1,NY+1):
-                UU[x][y] = uni[x-1][y-1]
-        return UU
+                    return True
+        return False
 
-    def __genesis(self, uni=None):
-        """Biblical kind. Not Phil Collins prog-rock kind."""
-        self.history.clear()
+    def __uni_to_id(self, uni):
+        """Return universe ID with 16x16 uni placed at the view."""
+        vx, vy = self.view
+        ID = 0
+        for x, col in enumerate(uni):
+            for y, cell in enumerate(col):
+                if cell and vx+x < self.nx and vy+y < self.ny:
+                    ID |= 1 << ((vx+x)*self.ny + vy+y)
+        return ID
+
+    def __seed(self, ID):
+        """Start over from universe ID."""
         self.generation = 1
         self.cycle_count = 0
+        self.engine.set_id(ID)
+        self.ID = self.__get_universe_id()
+        self.startID = self.ID
+        self.history.reset(self.ID, self.generation)
+
+    def __genesis_id(self, uni=None):
+        """Return ID of a new universe, from 16x16 uni or random."""
+        if self.metrics:
+            self.metrics.count('restarts')
         if uni==None:
-            self.U = self.createWorld(PERCENT_FILL)
-        else:
-            self.U = self.addUniBorder(uni)
-        self.history.appendleft(self.getUniverseID())
+            return self.__create_world(PERCENT_FILL)
+        return self.__uni_to_id(uni)
+
+    def __genesis(self, uni=None):
+        """Biblical kind. Not Phil Collins prog-rock kind."""
+        self.__seed(self.__genesis_id(uni))
+
+    def __apply_edits(self, ):
+        """Apply queued edits, in order, on the thread stepping. A new
+        universe also sets it running. Return True if there were any."""
+        if not self.edits:
+            return False
+        vx, vy = self.view
+        ID = self.ID
+        while self.edits:
+            kind, arg = self.edits.popleft()
+            if kind == SEED:
+                ID = self.__genesis_id(arg)
+                self.running = True
+                continue
+            for x, y, value in arg:
+                if 0 <= x < VIEW and 0 <= y < VIEW and vx+x < self.nx and vy+y < self.ny:
+                    bit = 1 << ((vx+x)*self.ny + vy+y)
+                    if value == TOGGLE:
+                        ID ^= bit
+                    elif value:
+                        ID |= bit
+                    else:
+                        ID &= ~bit
+        self.__seed(ID)
+        return True
+
+    def genesis(self, uni=None):
+        """Start over from 16x16 uni, or a random universe, queued like an
+        edit, so the next tick() returns generation 1 as an EDITED frame.
+        Only for use by whatever runs tick(), see golruntime."""
+        self.edits.append((SEED, uni))
+
+    def tick(self, ):
+        """Do one pass of the main loop, without showing or sleeping. Return
+        (generation, frame, kind) to show next, or None if paused."""
+        if self.__apply_edits():
+            return (self.generation, self.__get_view(), EDITED)
+        if not self.running:
+            return None
+        self.__update_universe()
+        if self.__check_cycles():
+            self.running = False
+            return None
+        return (self.generation, self.__get_view(), NEXT)
+
+    def get_frame(self, ):
+        """Return frame of the LEDs' view now, universe ID or row words."""
+        return self.__get_view()
+
+    def frame_period(self, ):
+        """Return secs between frames, from the rate knob, 0 if unthrottled."""
+        return self.__read_rate_knob() if self.throttle else 0
 
     def set_universe(self, uni):
-        """Run provided 16x16 Universe."""
+        """Run provided 16x16 Universe. Queued like an edit, so the thread
+        stepping starts it over between generations."""
         if not self.threadAlive:
             return
-        if self.running:
-            self.running = False
-        self.genesis(uni)
-        self.running = True
+        self.edits.append((SEED, uni))
+        self.__wake()
+
+    def edit(self, cells):
+        """Set cells, a list of (x, y, value) on the LEDs, all at once between
+        generations. value is 0, 1 or TOGGLE. Safe to call from any thread."""
+        self.edits.append((CELLS, list(cells)))
+        self.__wake()
+
+    def edit_words(self, words):
+        """Set all cells on the LEDs from 16 row words, as one edit."""
+        self.edit([(x, y, (words[x] >> y) & 0x01)
+                   for x in xrange(VIEW) for y in xrange(VIEW)])
+
+    def add_frame_listener(self, listener):
+        """Call listener(generation, frame) for each frame shown, from the
+        thread showing it, frame being a universe ID or row words. Must not
+        block."""
+        self.frame_listeners.append(listener)
+
+    def set_view(self, x, y):
+        """Move the LED matrix window to top left x, y of the universe."""
+        self.view = (max(0, min(x, self.nx - VIEW)), max(0, min(y, self.ny - VIEW)))
 
     def pause(self, ):
         """Pause thread main loop."""
         self.running = False
+        self.__wake()
     
     def restart(self, ):
         """Restart thread main loop."""
         self.running = True
+        self.__wake()
         
     def kill(self, ):
         """Kill thread."""
         self.threadAlive = False
         self.running = False
+        self.__wake()
+
+    def __wake(self, ):
+        """End any sleep of the main loop, and of the render thread."""
+        self.scheduler.wake()
+        if self.frames:
+            self.frames.wake()
 
     def run(self, ):
         """Don't call directly. Called when thread is started."""
         self.threadAlive = True
         self.running = True
+        if self.frames:
+            self.__run_ahead()
+            return
         
         while self.threadAlive:
             while self.running:
+              # Show any edits as they are, then carry on from them
+              if self.__apply_edits():
+                  self.__display_universe()
+                  self.__knob_sleep()
+                  continue
+
               # Start over if max generations reached
-              genKnob = self.readGenKnob()
+              genKnob = self.__read_gen_knob()
               if not(ALLOW_INFINITE and genKnob == MAX_GENS) and self.generation >= genKnob:
                   #print "Universe lived long enough at generation {0}.".format(self.generation)
                   #self.genesis()
                   pass
           
               # Update the universe per the rules of the game of life
-              self.U = self.updateUniverse()
+              self.__update_universe()
               
               # Check for still lifes and oscillators
-              ID = self.getUniverseID()
-              if self.history.count(ID):
-                  # Let it repeat for a few cycles
-                  self.cycle_count += 1
-                  if not self.max_cycles == 0 and self.cycle_count > self.max_cycles:
-                      p = 0
-                      if ID != 0:
-                          # Count period of oscillator                
-                          for h in self.history:
-                              p += 1
-                              if ID == h:
-                                  break
-                      #print("Oscillator period {0} at generation {1}.").format(p,self.generation)
+              if self.__check_cycles():
+                  self.running = False
+                  continue
                       
-                      # Store stats in database
-                      #store_stats(generation, p)
-                      
-                      # Start over
-                      if self.autoRestart:
-                        self.genesis()
-                      else:
-                        self.running = False
-                        continue
-                      
-              # Update history after 1st gen
-              if self.generation != 1:
-                  self.history.appendleft(ID)
-              
               # Display the current universe
-              self.displayUniverse()
+              self.__display_universe()
           
               # Sleep
-              self.knobSleep()
\ No newline at end of file
+              self.__knob_sleep()
+
+            # Paused, wait to be woken, show any edits made meanwhile, for
+            # a whole frame if a new universe set it running
+            if self.threadAlive:
+                self.scheduler.idle()
+                if self.__apply_edits():
+                    self.__display_universe()
+                    if self.running:
+                        self.__knob_sleep()
+
+    def __run_ahead(self, ):
+        """Main loop in ahead mode. This thread makes frames into the ring,
+        with cycle checks done, and the render thread shows them."""
+        render = threading.Thread(target=self.__render_ahead, name="GOLRender")
+        render.daemon = True
+        render.start()
+        frames = self.frames
+        while self.threadAlive:
+            # Edits and new universes replace whatever was made ahead. Only
+            # this thread clears the ring, so the epoch read below is current
+            if self.__apply_edits():
+                frames.clear()
+                frames.put((self.generation, self.__get_view(), EDITED), frames.epoch)
+                self.scheduler.wake()
+                continue
+
+            # Make the next frame once there is room for it
+            epoch = frames.epoch
+            if self.running and self.finished != epoch:
+                if not frames.wait_room():
+                    continue
+                self.__update_universe()
+                kind = NEXT
+                if self.__check_cycles():
+                    kind = FINISHED
+                    self.finished = epoch
+                frames.put((self.generation, self.__get_view(), kind), epoch)
+            else:
+                frames.idle(IDLE)
+        render.join()
+
+    def __render_ahead(self, ):
+        """Render thread in ahead mode. Show frames at the knob rate."""
+        frames = self.frames
+        while self.threadAlive:
+            if self.running:
+                item = frames.get()
+            else:
+                # Paused, show only edits
+                self.scheduler.idle()
+                item = frames.peek()
+                if item is None or item[2] != EDITED:
+                    continue
+                item = frames.get()
+            if item is None:
+                continue
+            generation, frame, kind = item
+            if kind == FINISHED:
+                self.running = False
+                self.finished = None
+                continue
+            self.show(generation, frame)
+            if self.running:
+                self.__knob_sleep()
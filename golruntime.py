@@ -0,0 +1,191 @@
+#===============================================================================
+# golruntime.py
+#
+# Runs GOL on the Tornado IOLoop instead of as its own thread.
+#
+# Each generation is a tick scheduled on the IOLoop with call_at(), paced
+# like FrameScheduler, each frame due one period after the last was due.
+# Stepping is quick and runs on the IOLoop. Showing a frame means knob reads
+# and I2C writes, so it runs on a single worker executor, which keeps the
+# hardware to one thread, and the IOLoop keeps serving while it waits.
+#
+# Control goes through a command queue. The methods below can be called from
+# any thread, only queue the command and wake the IOLoop. The commands are
+# carried out, in order, at the start of the next tick, which is run at once
+# unless one is already under way. A tick run early for a command only steps
+# if the command gave something new to show, a new universe, an edit or a
+# restart from pause. Nothing else touches GOL, so no locking is needed.
+# Turning the rate knob moves the pending tick right away. An error in a
+# tick, e.g. from a frame listener, is logged and the next tick scheduled
+# as usual, so the runtime never stops ticking on its own.
+#
+# LifeRuntime has the same set_universe(), edit(), edit_words(), pause() and
+# restart() as GOL, so the web handlers take either.
+#===============================================================================
+from collections import deque
+
+import tornado.gen
+import tornado.ioloop
+from tornado.log import app_log
+from concurrent.futures import ThreadPoolExecutor
+
+from gol import RATE_KNOB
+
+RUN         = 0     # commands, see LifeRuntime.__do_commands()
+PAUSE       = 1
+RESTART     = 2
+BRIGHTNESS  = 3
+EDIT        = 4
+
+class LifeRuntime():
+    """Drive a GOL from the IOLoop, with display I/O on an executor."""
+
+    def __init__(self, gol, ioloop=None, executor=None):
+        self.gol = gol
+        self.ioloop = ioloop or tornado.ioloop.IOLoop.current()
+        self.executor = executor or ThreadPoolExecutor(max_workers=1)
+        self.commands = deque()
+        self.pending = False    # wake callback queued
+        self.ticking = False    # tick under way
+        self.handle = None      # timeout of next tick
+        self.last = None        # when the last tick was due
+        self.due = None         # when the next tick is due
+        self.started = False
+
+    #---------------------------------------------------------------
+    #       C O M M A N D S,  safe to call from any thread
+    #---------------------------------------------------------------
+    def set_universe(self, uni=None):
+        """Run provided 16x16 universe, or a random one."""
+        self.__submit(RUN, uni)
+
+    def pause(self, ):
+        self.__submit(PAUSE)
+
+    def restart(self, ):
+        self.__submit(RESTART)
+
+    def set_brightness(self, brightness=None):
+        """Fix brightness, or None to go back to the knob."""
+        self.__submit(BRIGHTNESS, brightness)
+
+    def edit(self, cells):
+        """Set cells, see GOL.edit()."""
+        self.__submit(EDIT, list(cells))
+
+    def edit_words(self, words):
+        """Set all cells on the LEDs from 16 row words, as one edit."""
+        self.edit([(x, y, (words[x] >> y) & 0x01)
+                   for x in xrange(16) for y in xrange(16)])
+
+    def __submit(self, op, arg=None):
+        self.commands.append((op, arg))
+        if not self.pending:
+            self.pending = True
+            self.ioloop.add_callback(self.__wake)
+
+    #---------------------------------------------------------------
+    #           I O L O O P,  everything below runs on it
+    #---------------------------------------------------------------
+    def start(self, ):
+        """Start ticking. Call on the IOLoop, or before it is started."""
+        self.started = True
+        self.gol.running = True
+        self.gol.display.knobs.add_listener(self.__knob_changed)
+        self.ioloop.add_callback(self.__wake)
+
+    def stop(self, ):
+        """Stop ticking and wait for any display write to finish."""
+        self.started = False
+        self.__cancel()
+        self.executor.shutdown(wait=True)
+
+    def __knob_changed(self, chan, value):
+        """Knob listener, on the knob thread."""
+        if chan == RATE_KNOB:
+            self.ioloop.add_callback(self.__reschedule)
+
+    def __wake(self, ):
+        """Run next tick now, unless one is under way, which will see the
+        commands when done."""
+        self.pending = False
+        if self.started and not self.ticking:
+            self.__cancel()
+            self.__tick()
+
+    def __cancel(self, ):
+        if self.handle:
+            self.ioloop.remove_timeout(self.handle)
+            self.handle = None
+
+    def __do_commands(self, ):
+        """Carry out queued commands. Return (step, refresh), True if GOL has
+        something new to show now, and if the frame shown should be shown
+        again."""
+        gol = self.gol
+        step = refresh = False
+        while self.commands:
+            op, arg = self.commands.popleft()
+            if op == RUN:
+                gol.genesis(arg)    # shown as generation 1 by the next tick()
+                gol.running = True
+                step = True
+            elif op == PAUSE:
+                gol.running = False
+            elif op == RESTART:
+                step = step or not gol.running
+                gol.running = True
+            elif op == BRIGHTNESS:
+                gol.fixed_brightness = arg
+                refresh = True
+            elif op == EDIT:
+                gol.edit(arg)
+                step = True
+        return step, refresh
+
+    @tornado.gen.coroutine
+    def __tick(self, scheduled=False):
+        """One generation: commands, step, show, schedule the next."""
+        gol = self.gol
+        self.handle = None
+        self.ticking = True
+        try:
+            if scheduled:
+                if gol.metrics:
+                    gol.metrics.add('overshoot', self.ioloop.time() - self.due)
+                self.last = self.due
+            step, refresh = self.__do_commands()
+            if step and not scheduled:
+                self.last = None    # pace from this frame
+            item = gol.tick() if scheduled or step else None
+            if item is None and refresh:
+                item = (gol.generation, gol.get_frame())
+            if item:
+                yield self.ioloop.run_in_executor(self.executor, gol.show, item[0], item[1])
+        except Exception:
+            app_log.exception("Error in GOL tick")
+        finally:
+            self.ticking = False
+        if self.commands:
+            self.__wake()
+        else:
+            self.__schedule()
+
+    def __schedule(self, ):
+        """Schedule next tick one period after the last was due."""
+        if not (self.started and self.gol.running):
+            self.last = None
+            return
+        now = self.ioloop.time()
+        period = self.gol.frame_period()
+        if self.last is None or now - (self.last + period) > period:
+            # first frame, or fell a whole frame behind, don't catch up
+            self.last = now
+        self.due = self.last + period
+        self.handle = self.ioloop.call_at(self.due, self.__tick, True)
+
+    def __reschedule(self, ):
+        """Move pending tick for a new frame period."""
+        if self.handle:
+            self.__cancel()
+            self.__schedule()
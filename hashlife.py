@@ -0,0 +1,286 @@
+#===============================================================================
+# hashlife.py
+#
+# HashLife engine for Conway's Game of Life.
+#
+# The universe is held as a quadtree of hash-consed nodes. A node of level k
+# covers 2**k x 2**k cells and has four children of level k-1:
+#
+#       ---x
+#       | +---+---+
+#       y | a | b |
+#         +---+---+
+#         | c | d |
+#         +---+---+
+#
+# Identical subtrees are stored once, and the result of advancing the center
+# of a node is memoized, so long-lived patterns can be jumped ahead 2**j
+# generations in a single call. Memoized results are kept in an LRU cache
+# bounded by max_cache entries, and the node table is trimmed back to the
+# nodes still in use once it grows past max_nodes.
+#
+# NOTE: HashLife runs on an unbounded plane. The NX x NY universe is a window
+# into that plane, so results match the bounded engines only while the
+# pattern stays clear of the window edge. This is meant for offline analysis
+# of oscillators and methuselahs found on the device.
+#===============================================================================
+from collections import OrderedDict
+
+from liferules import CONWAY, get_rule
+
+NX = 16
+NY = 16
+MAX_CACHE = 200000      # maximum memoized successor results
+MAX_NODES = 1000000     # node table size that triggers a trim
+
+class Node(object):
+    """Quadtree node. Leaves are level 0 with pop of 0 or 1."""
+    __slots__ = ('k', 'a', 'b', 'c', 'd', 'pop')
+
+    def __init__(self, k, a=None, b=None, c=None, d=None, pop=0):
+        self.k = k
+        self.a = a
+        self.b = b
+        self.c = c
+        self.d = d
+        self.pop = pop
+
+OFF = Node(0, pop=0)
+ON = Node(0, pop=1)
+
+class HashLife():
+    """HashLife Game of Life engine."""
+
+    def __init__(self, nx=NX, ny=NY, max_cache=MAX_CACHE, max_nodes=MAX_NODES, rule=CONWAY, wrap=False):
+        if wrap:
+            raise ValueError("HashLife runs on an unbounded plane, it can't wrap.")
+        self.rule = get_rule(rule)
+        if 0 in self.rule.birth:
+            raise ValueError("HashLife can't run B0 rules.")
+        self.nx = nx
+        self.ny = ny
+        self.max_cache = max_cache
+        self.max_nodes = max_nodes
+        self.nodes = {}
+        self.cache = OrderedDict()
+        self.zeros = [OFF]
+        self.hits = 0
+        self.misses = 0
+        self.k0 = 3
+        while (1 << (self.k0-1)) < max(nx, ny):
+            self.k0 += 1
+        self.root = self.__zero(self.k0)
+        self.id_root = None
+        self.id = 0
+
+    #---------------------------------------------------------------
+    #                     N O D E   T A B L E
+    #---------------------------------------------------------------
+    def __join(self, a, b, c, d):
+        """Return the canonical node with the given children."""
+        key = (a, b, c, d)
+        node = self.nodes.get(key)
+        if node is None:
+            node = Node(a.k+1, a, b, c, d, a.pop + b.pop + c.pop + d.pop)
+            self.nodes[key] = node
+        return node
+
+    def __zero(self, k):
+        """Return the empty node of level k."""
+        while len(self.zeros) <= k:
+            z = self.zeros[-1]
+            self.zeros.append(self.__join(z, z, z, z))
+        return self.zeros[k]
+
+    def __centre(self, m):
+        """Return node one level up with m in the middle."""
+        z = self.__zero(m.k-1)
+        return self.__join(self.__join(z, z, z, m.a),
+                           self.__join(z, z, m.b, z),
+                           self.__join(z, m.c, z, z),
+                           self.__join(m.d, z, z, z))
+
+    def __trim(self, ):
+        """Rebuild node table from nodes still reachable."""
+        keep = {}
+        stack = [self.root] + self.zeros
+        for (m, j), s in self.cache.iteritems():
+            stack.append(m)
+            stack.append(s)
+        while stack:
+            m = stack.pop()
+            if m.k == 0:
+                continue
+            key = (m.a, m.b, m.c, m.d)
+            if key in keep:
+                continue
+            keep[key] = m
+            stack.extend(key)
+        self.nodes = keep
+
+    #---------------------------------------------------------------
+    #                       E V O L U T I O N
+    #---------------------------------------------------------------
+    def __life_4x4(self, m):
+        """Return the center 2x2 of a 4x4 node after one generation."""
+        g = [[m.a.a.pop, m.a.b.pop, m.b.a.pop, m.b.b.pop],
+             [m.a.c.pop, m.a.d.pop, m.b.c.pop, m.b.d.pop],
+             [m.c.a.pop, m.c.b.pop, m.d.a.pop, m.d.b.pop],
+             [m.c.c.pop, m.c.d.pop, m.d.c.pop, m.d.d.pop]]
+        next_state = self.rule.next_state
+        new = []
+        for y in (1, 2):
+            for x in (1, 2):
+                N = g[y-1][x-1] + g[y-1][x] + g[y-1][x+1] + \
+                    g[y][x-1]   +             g[y][x+1]   + \
+                    g[y+1][x-1] + g[y+1][x] + g[y+1][x+1]
+                new.append(ON if next_state[g[y][x]][N] else OFF)
+        return self.__join(*new)
+
+    def __successor(self, m, j):
+        """Return center of m, one level down, 2**j generations later."""
+        if m.pop == 0:
+            return m.a
+        j = min(j, m.k-2)
+        key = (m, j)
+        s = self.cache.pop(key, None)
+        if s is not None:
+            self.hits += 1
+            self.cache[key] = s
+            return s
+        self.misses += 1
+        join = self.__join
+        succ = self.__successor
+        if m.k == 2:
+            s = self.__life_4x4(m)
+        else:
+            a, b, c, d = m.a, m.b, m.c, m.d
+            c1 = succ(a, j)
+            c2 = succ(join(a.b, b.a, a.d, b.c), j)
+            c3 = succ(b, j)
+            c4 = succ(join(a.c, a.d, c.a, c.b), j)
+            c5 = succ(join(a.d, b.c, c.b, d.a), j)
+            c6 = succ(join(b.c, b.d, d.a, d.b), j)
+            c7 = succ(c, j)
+            c8 = succ(join(c.b, d.a, c.d, d.c), j)
+            c9 = succ(d, j)
+            if j < m.k - 2:
+                s = join(join(c1.d, c2.c, c4.b, c5.a),
+                         join(c2.d, c3.c, c5.b, c6.a),
+                         join(c4.d, c5.c, c7.b, c8.a),
+                         join(c5.d, c6.c, c8.b, c9.a))
+            else:
+                s = join(succ(join(c1, c2, c4, c5), j),
+                         succ(join(c2, c3, c5, c6), j),
+                         succ(join(c4, c5, c7, c8), j),
+                         succ(join(c5, c6, c8, c9), j))
+        self.cache[key] = s
+        if len(self.cache) > self.max_cache:
+            self.cache.popitem(last=False)
+        return s
+
+    def __is_padded(self, m):
+        """Return True if all live cells are in the inner half of m."""
+        return m.pop == m.a.d.d.pop + m.b.c.c.pop + m.c.b.b.pop + m.d.a.a.pop
+
+    def __crop(self, m):
+        """Return smallest centered node, but no smaller than the window."""
+        while m.k > self.k0 and m.pop == m.a.d.pop + m.b.c.pop + m.c.b.pop + m.d.a.pop:
+            m = self.__join(m.a.d, m.b.c, m.c.b, m.d.a)
+        return m
+
+    def advance_pow2(self, j):
+        """Jump ahead 2**j generations."""
+        m = self.root
+        while m.k < j+2 or not self.__is_padded(m):
+            m = self.__centre(m)
+        self.root = self.__crop(self.__successor(self.__centre(m), j))
+        if len(self.nodes) > self.max_nodes:
+            self.__trim()
+
+    def advance(self, n):
+        """Jump ahead n generations, one 2**j jump per set bit of n."""
+        j = 0
+        while n:
+            if n & 1:
+                self.advance_pow2(j)
+            n >>= 1
+            j += 1
+
+    def step(self, ):
+        """Life goes on."""
+        self.advance_pow2(0)
+
+    #---------------------------------------------------------------
+    #                      U N I V E R S E
+    #---------------------------------------------------------------
+    def __build(self, k, x0, y0, cell):
+        """Return node of level k with top left corner at x0, y0."""
+        size = 1 << k
+        if x0 >= self.nx or y0 >= self.ny or x0 + size <= 0 or y0 + size <= 0:
+            return self.__zero(k)
+        if k == 0:
+            return ON if cell(x0, y0) else OFF
+        half = size >> 1
+        return self.__join(self.__build(k-1, x0, y0, cell),
+                           self.__build(k-1, x0+half, y0, cell),
+                           self.__build(k-1, x0, y0+half, cell),
+                           self.__build(k-1, x0+half, y0+half, cell))
+
+    def set_universe(self, uni):
+        """Set universe from (nx+2)x(ny+2) list of lists with border."""
+        half = 1 << (self.k0-1)
+        self.root = self.__build(self.k0, -half, -half,
+                                 lambda x, y: uni[x+1][y+1])
+
+    def set_id(self, ID):
+        """Set universe from universe ID."""
+        half = 1 << (self.k0-1)
+        self.root = self.__build(self.k0, -half, -half,
+                                 lambda x, y: (ID >> (x*self.ny + y)) & 0x01)
+
+    def get_universe(self, ):
+        """Return universe as (nx+2)x(ny+2) list of lists with border."""
+        UU = [[0 for y in xrange(self.ny+2)] for x in xrange(self.nx+2)]
+        for x in xrange(self.nx):
+            for y in xrange(self.ny):
+                UU[x+1][y+1] = self.get_cell(x, y)
+        return UU
+
+    def get_cell(self, x, y):
+        """Return value of cell at x, y. Cells outside the window are valid."""
+        m = self.root
+        half = 1 << (m.k-1)
+        x += half
+        y += half
+        if not (0 <= x < 2*half and 0 <= y < 2*half):
+            return 0
+        while m.k > 0 and m.pop:
+            half = 1 << (m.k-1)
+            if y < half:
+                m = m.a if x < half else m.b
+            else:
+                m = m.c if x < half else m.d
+                y -= half
+            if x >= half:
+                x -= half
+        return m.pop
+
+    def get_id(self, ):
+        """Return unique 2**(nx*ny) bit integer value for the window."""
+        if self.root is self.id_root:
+            return self.id
+        N = 0
+        ID = 0
+        for x in xrange(self.nx):
+            for y in xrange(self.ny):
+                if self.get_cell(x, y):
+                    ID |= 1 << N
+                N += 1
+        self.id_root = self.root
+        self.id = ID
+        return ID
+
+    def get_population(self, ):
+        """Return number of live cells on the whole plane."""
+        return self.root.pop
\ No newline at end of file
@@ -0,0 +1,177 @@
+#===============================================================================
+# headless.py
+#
+# Hardware free stand-ins for the 16x16 LED matrix and the knob ADC, so GOL
+# can be run and profiled on any box.
+#
+# MemoryMatrix has the same interface as Matrix16x16 and records the frames
+# written to it as 256 bit universe IDs. MemoryBackpack stands in for one
+# Adafruit 8x16 backpack under a real Matrix16x16, for timing its frame
+# building and display diffing. ScriptedADC has the same read_adc()
+# as the MCP3008 and replays knob values from a text file with one line per
+# sample of all knobs:
+#
+#       # rate gens brightness
+#       0    1023 512
+#       1023 1023 512
+#
+# Run directly to time the full GOL loop, unthrottled:
+#
+#       python headless.py [secs] [knob_file]
+#===============================================================================
+from collections import deque
+
+from bitlife import words_to_id
+
+NUM_KNOBS   = 3
+MAX_FRAMES  = 10000     # frames kept by MemoryMatrix
+KNOBS       = (0, 1023, 1023)   # fastest, infinite, brightest
+
+class MemoryMatrix():
+    """In memory 16x16 frame buffer with the Matrix16x16 interface."""
+
+    def __init__(self, bottom=0x70, top=0x71, brightness=15, max_frames=MAX_FRAMES):
+        self.frame = 0
+        self.frames = deque(maxlen=max_frames)
+        self.writes = 0
+        self.brightness = brightness
+        self.brightness_writes = 0
+
+    def clear(self, ):
+        self.frame = 0
+
+    def write_display(self, force=False):
+        self.frames.append(self.frame)
+        self.writes += 1
+
+    def set_pixel(self, x, y, value):
+        if not (0 <= x < 16 and 0 <= y < 16):
+            return
+        bit = 1 << (x*16 + y)
+        if value:
+            self.frame |= bit
+        else:
+            self.frame &= ~bit
+
+    def set_brightness(self, brightness):
+        self.brightness = brightness
+        self.brightness_writes += 1
+
+    def set_frame(self, frame):
+        """Set whole frame from universe ID, row words or 32 bytes."""
+        if isinstance(frame, (int, long)):
+            self.frame = frame
+        elif isinstance(frame, (str, bytearray)):
+            self.frame = int(str(bytearray(frame))[::-1].encode('hex'), 16)
+        else:
+            self.frame = words_to_id(frame)
+
+    def set_raw256(self, value):
+        """Show 256 bit value in LED16x16ICONS format."""
+        self.clear()
+        for y in xrange(16):
+            for x in xrange(16):
+                self.set_pixel(15-x,15-y, value & 0x01)
+                value >>= 1
+        self.write_display()
+
+class MemoryDevice():
+    """I2C device that counts the bytes written to it."""
+
+    def __init__(self, ):
+        self.writes = 0
+        self.bytes = 0
+
+    def write8(self, register, value):
+        self.writes += 1
+        self.bytes += 1
+
+    def writeList(self, register, data):
+        self.writes += 1
+        self.bytes += len(data)
+
+class MemoryBackpack():
+    """In memory HT16K33 8x16 backpack with the Adafruit Matrix8x16 interface."""
+
+    def __init__(self, address=0x70, **kwargs):
+        self.address = address
+        self.buffer = bytearray(16)
+        self._device = MemoryDevice()
+        self.brightness = 15
+
+    def begin(self, ):
+        pass
+
+    def clear(self, ):
+        self.buffer[:] = bytearray(16)
+
+    def set_brightness(self, brightness):
+        self.brightness = brightness
+
+    def write_display(self, ):
+        for register, value in enumerate(self.buffer):
+            self._device.write8(register, value)
+
+    def set_pixel(self, x, y, value):
+        if not (0 <= x < 8 and 0 <= y < 16):
+            return
+        led = y*8 + x
+        if value:
+            self.buffer[led >> 3] |= 1 << (led & 0x07)
+        else:
+            self.buffer[led >> 3] &= ~(1 << (led & 0x07))
+
+class ScriptedADC():
+    """Knob ADC replaying values from a file, one line per sample.
+
+    A new line is taken each time channel 0 is read, which is once per pass
+    of the knob sampler. The last line is held once the file runs out, unless
+    loop is True.
+    """
+
+    def __init__(self, filename=None, values=None, loop=False):
+        if filename is not None:
+            values = []
+            with open(filename) as f:
+                for line in f:
+                    line = line.split('#')[0].split()
+                    if line:
+                        values.append([int(v) for v in line])
+        self.values = values or [list(KNOBS)]
+        self.loop = loop
+        self.index = -1
+        self.reads = 0
+
+    def read_adc(self, chan):
+        """Return the scripted ADC value for the given channel."""
+        self.reads += 1
+        if chan == 0:
+            self.index += 1
+            if self.index >= len(self.values):
+                self.index = 0 if self.loop else len(self.values) - 1
+        return self.values[max(self.index, 0)][chan]
+
+#--------------------------------------------------------------------
+# M A I N
+#--------------------------------------------------------------------
+if __name__ == '__main__':
+    import sys
+    import time
+    from lifedisplay import LifeDisplay
+    from gol import GOL
+
+    secs = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+    knobs = sys.argv[2] if len(sys.argv) > 2 else None
+
+    matrix = MemoryMatrix()
+    gol = GOL(display=LifeDisplay(disp=matrix, adc=ScriptedADC(knobs)))
+    gol.autoRestart = True
+    gol.throttle = False
+    gol.start()
+    time.sleep(secs)
+    gol.kill()
+    gol.join()
+    gol.display.knobs.stop()
+    gol.display.knobs.join()
+    print "{0} frames in {1} secs, {2:.1f} frames/sec, {3} brightness writes".format(
+        matrix.writes, secs, matrix.writes / secs, matrix.brightness_writes)
\ No newline at end of file
@@ -11,13 +11,13 @@
 # 2016-12-09
 # Carter Nelson
 #===============================================================================
-from time import sleep
-from datetime import datetime
 from random import randrange
-from collections import deque
-#import sqlite3
 
 from lifedisplay import LifeDisplay
+from cycledetector import CycleDetector
+from framescheduler import FrameScheduler
+from bitlife import BitLife
+from lifestats import StatsWriter
 
 MIN_RATE        = 0.01  # fastest rate (secs)
 MAX_RATE        = 1.00  # slowest   "    "
@@ -26,26 +26,32 @@ MAX_GENS        = 500   # maximum   "    "    "         "
 MIN_BRIGHTNESS  = 1     # minimum brightness setting
 MAX_BRIGHTNESS  = 15    # maximum    "          "
 PERCENT_FILL    = 50    # universe fill factor
-MAX_HIST        = 20    # maximum history to track universe
+MAX_HIST        = 1000  # maximum history to track universe (longest period)
 MAX_CYCLES      = 20    # maximum cycles for oscillators
 RATE_KNOB       = 0
 GEN_KNOB        = 1
 BRIGHTNESS_KNOB = 2
 ALLOW_INFINITE  = True  # if True, max gen = infinite
 SQLDB           = 'life_stats.db'
+STORE_STATS     = False # if True, store stats in SQLDB
 
 NX = 16
 NY = 16
 
 life_disp = LifeDisplay()
-
-history = deque(maxlen=MAX_HIST)
+life = BitLife(NX, NY)
+
+history = CycleDetector(MAX_HIST)
+scheduler = FrameScheduler()
+stats = None
+if STORE_STATS:
+    stats = StatsWriter(SQLDB)
+    stats.start()
 cycle_count = 0
 
-# create darkness
-U = [[0 for x in xrange(NX+2)] for y in xrange(NY+2)]
 generation = 0
 startID = 0
+brightness = None
 
 def read_gen_knob():
     """Return max generation value for current knob setting."""
@@ -64,9 +70,7 @@ def read_brightness_knob():
 
 def knob_sleep():
     """Sleep, but also check knob while doing so."""
-    start_wait = datetime.now()
-    while (datetime.now() - start_wait).total_seconds() < read_rate_knob():
-        pass  # the dutchie on the left hand side
+    scheduler.wait(read_rate_knob)
 
 def create_world(fill):
     """Let there be light."""
@@ -79,60 +83,35 @@ def create_world(fill):
         
 def get_universe_id():
     """Return unique 2**256 bit integer value."""
-    N = 0;
-    ID = 0;
-    for x in xrange(NX):
-        for y in xrange(NY):
-            ID += U[x+1][y+1]*(2**N)
-            N += 1
-    return ID
+    return life.get_id()
 
 def display_universe():
     """Show it."""
+    global brightness
     try:
-        life_disp.set_brightness(read_brightness_knob())
-        life_disp.clear()
-        for x in xrange(NX):
-            for y in xrange(NY):
-                life_disp.set_pixel(x, y, U[x+1][y+1])
+        value = read_brightness_knob()
+        if value != brightness:
+            life_disp.set_brightness(value)
+            brightness = value
+        life_disp.set_frame(life.get_id())
         life_disp.write_display()
     except IOError:
         print "I2C comm barf. But life goes on!"
 
-def count_neighbors(x, y):
-    """Return neighbor count."""
-    return  U[x-1][y-1] + U[x][y-1] + U[x+1][y-1] + \
-            U[x-1][y]   +             U[x+1][y]   + \
-            U[x-1][y+1] + U[x][y+1] + U[x+1][y+1]
-
 def update_universe():
     """Life goes on."""
     global generation
     generation += 1
-    UU = [[0 for x in xrange(NX+2)] for y in xrange(NY+2)]
-    for x in xrange(1,NX+1):
-        for y in xrange(1,NY+1):
-            UU[x][y] = U[x][y]
-            N = count_neighbors(x,y)
-            if UU[x][y]:
-                # live cell rules
-                if N < 2 or N > 3:
-                    UU[x][y] = 0
-            else:
-                # dead cell rules
-                if N == 3:
-                    UU[x][y] = 1
-    return UU
+    life.step()
 
 def genesis():
     """Biblical kind. Not Phil Collins prog-rock kind."""
-    global U, generation, cycle_count, startID
-    history.clear()
+    global generation, cycle_count, startID
     generation = 1
     cycle_count = 0
-    U = create_world(PERCENT_FILL)
+    life.set_universe(create_world(PERCENT_FILL))
     startID = get_universe_id()
-    history.appendleft(startID)
+    history.reset(startID, generation)
     display_universe()
     knob_sleep()
 
@@ -147,33 +126,26 @@ while True:
         genesis()
 
     # Update the universe per the rules of the game of life
-    U = update_universe()
+    update_universe()
     
     # Check for still lifes and oscillators
     ID = get_universe_id()
-    if history.count(ID):
+    p = history.update(ID, generation)
+    if p:
         # Let it repeat for a few cycles
         cycle_count += 1
         if (cycle_count > MAX_CYCLES):
-            p = 0
-            if ID != 0:
-                # Count period of oscillator                
-                for h in history:
-                    p += 1
-                    if ID == h:
-                        break
+            if ID == 0:
+                p = 0
             print("Oscillator period {0} at generation {1}.").format(p,generation)
             
             # Store stats in database
-            #store_stats(generation, p)
+            if stats:
+                stats.store(startID, generation, p)
             
             # Start over
             genesis()
             
-    # Update history after 1st gen
-    if generation != 1:
-        history.appendleft(ID)
-    
     # Display the current universe
     display_universe()
 
@@ -0,0 +1,234 @@
+#===============================================================================
+# lifebench.py
+#
+# Benchmarks for stepping, universe IDs, cycle detection and frame building,
+# run on any box with the headless stand-ins for the hardware.
+#
+# The workload is fixed: SOUPS seeded soups made like GOL's create_world()
+# plus a glider, an R-pentomino and a blinker, each stepped GENS generations.
+# Every result is a rate, higher is better, the best of REPEAT runs of at
+# least MIN_TIME seconds each:
+#
+#       step.<engine>       engine.step() alone, generations/sec
+#       update.<engine>     GOL.__update_universe(), step plus universe ID
+#       cycle.update        CycleDetector.update() calls/sec
+#       render.set_frame    Matrix16x16.set_frame() frames/sec
+#       render.set_raw256   Matrix16x16.set_raw256() frames/sec
+#       render.display      GOL.__display_universe() frames/sec
+#
+# plus, not checked, id_us.<engine>, the microseconds per generation that
+# __get_universe_id() adds to a step, and hit_rate.<engine> for the engines
+# with a transition cache. Each pass over the workload steps with a new
+# engine, so the transition caches and HashLife's memo only hit on states
+# seen within it and the rates are of stepping, not of looking up the last
+# pass. Results print as JSON, and
+# can be saved as a baseline or checked against one:
+#
+#       python lifebench.py
+#       python lifebench.py --save lifebench_baseline.json
+#       python lifebench.py --check lifebench_baseline.json
+#
+# --check exits with status 1 if any result is more than --tolerance slower
+# than the baseline. Rates only compare on the same box and Python, so keep
+# a baseline per machine.
+#===============================================================================
+import argparse
+import json
+import platform
+import sys
+import time
+from random import Random
+
+import soupsearch
+from cycledetector import CycleDetector
+from bitlife import BitLife
+from gol import GOL, ENGINES
+from headless import MemoryBackpack, ScriptedADC
+from lifecache import TransitionCache
+from lifedisplay import LifeDisplay
+from matrix16x16 import Matrix16x16
+
+BASELINE    = 'lifebench_baseline.json'
+GENS        = 50        # generations stepped from each start
+SOUPS       = 8         # seeded soups in the workload
+REPEAT      = 5         # runs of each benchmark, best is kept
+MIN_TIME    = 0.2       # shortest run (secs), the workload is repeated to fill it
+TOLERANCE   = 0.25      # fraction slower than baseline that fails --check
+MAX_HIST    = 1000      # cycle detector history, as in GOL
+
+def pattern(cells, x0=6, y0=6, ny=16):
+    """Return universe ID for list of (x, y) cells placed at x0, y0."""
+    ID = 0
+    for x, y in cells:
+        ID |= 1 << ((x0+x)*ny + y0+y)
+    return ID
+
+PATTERNS = {
+    'glider'    : pattern([(1, 0), (2, 1), (0, 2), (1, 2), (2, 2)]),
+    'rpentomino': pattern([(1, 0), (2, 0), (0, 1), (1, 1), (1, 2)]),
+    'blinker'   : pattern([(0, 1), (1, 1), (2, 1)]),
+}
+
+def starts():
+    """Return starting universe IDs of the workload."""
+    soups = [soupsearch.create_world(Random(seed)) for seed in xrange(SOUPS)]
+    return soups + [PATTERNS[name] for name in sorted(PATTERNS)]
+
+def runs(ids, gens=GENS):
+    """Return list of the universe IDs of each start as it is stepped."""
+    life = BitLife()
+    result = []
+    for ID in ids:
+        life.set_id(ID)
+        run = [ID]
+        for i in xrange(gens):
+            life.step()
+            run.append(life.get_id())
+        result.append(run)
+    return result
+
+def best_rate(func, count, repeat=REPEAT):
+    """Return best rate of count things done by each func() over repeat runs."""
+    best = 0.0
+    for i in xrange(repeat):
+        done = 0
+        start = time.time()
+        while True:
+            func()
+            done += count
+            secs = time.time() - start
+            if secs >= MIN_TIME:
+                break
+        best = max(best, done / secs)
+    return best
+
+def bench_engines(display, ids, repeat=REPEAT):
+    """Return (results, id_us, hit_rate) for stepping with each engine."""
+    results = {}
+    id_us = {}
+    hit_rate = {}
+    count = len(ids) * GENS
+    for name in sorted(ENGINES):
+        gol = GOL(engine=name, display=display)
+        update = gol._GOL__update_universe
+        def fresh():
+            """Give gol a new engine, with nothing cached from the last pass."""
+            gol.engine = ENGINES[name](gol.nx, gol.ny)
+            return gol.engine
+        def steps():
+            engine = fresh()
+            for ID in ids:
+                engine.set_id(ID)
+                for i in xrange(GENS):
+                    engine.step()
+        def updates():
+            engine = fresh()
+            for ID in ids:
+                engine.set_id(ID)
+                for i in xrange(GENS):
+                    update()
+        step_rate = best_rate(steps, count, repeat)
+        update_rate = best_rate(updates, count, repeat)
+        results['step.' + name] = step_rate
+        results['update.' + name] = update_rate
+        id_us[name] = max(0.0, 1e6/update_rate - 1e6/step_rate)
+        steps()
+        cache = getattr(gol.engine, 'cache', None)
+        if isinstance(cache, TransitionCache):
+            hit_rate[name] = cache.hits / float(max(1, cache.hits + cache.misses))
+    return results, id_us, hit_rate
+
+def bench_cycles(trajectories, repeat=REPEAT):
+    """Return results for cycle detection along the workload."""
+    history = CycleDetector(MAX_HIST)
+    def run():
+        for run in trajectories:
+            history.reset(run[0], 1)
+            for generation in xrange(1, len(run)):
+                history.update(run[generation], generation+1)
+    count = sum(len(run) - 1 for run in trajectories)
+    return {'cycle.update': best_rate(run, count, repeat)}
+
+def bench_render(display, frames, repeat=REPEAT):
+    """Return results for building and writing frames."""
+    matrix = display.disp
+    def set_frames():
+        for ID in frames:
+            matrix.set_frame(ID)
+    def set_raw256s():
+        for ID in frames:
+            matrix.set_raw256(ID)
+    gol = GOL(display=display)
+    show = gol._GOL__display_universe
+    def displays():
+        for ID in frames:
+            gol.ID = ID
+            show()
+    return {
+        'render.set_frame'  : best_rate(set_frames, len(frames), repeat),
+        'render.set_raw256' : best_rate(set_raw256s, len(frames), repeat),
+        'render.display'    : best_rate(displays, len(frames), repeat),
+    }
+
+def run_benchmarks(repeat=REPEAT):
+    """Return dict of all results, see above."""
+    display = LifeDisplay(disp=Matrix16x16(backpack=MemoryBackpack), adc=ScriptedADC())
+    try:
+        ids = starts()
+        trajectories = runs(ids, 4*GENS)
+        frames = [ID for run in runs(ids) for ID in run]
+        results, id_us, hit_rate = bench_engines(display, ids, repeat)
+        results.update(bench_cycles(trajectories, repeat))
+        results.update(bench_render(display, frames, repeat))
+    finally:
+        display.knobs.stop()
+        display.knobs.join()
+    return {
+        'python'    : platform.python_version(),
+        'machine'   : platform.machine(),
+        'gens'      : GENS,
+        'starts'    : len(ids),
+        'results'   : dict((k, round(v, 1)) for k, v in results.iteritems()),
+        'id_us'     : dict((k, round(v, 3)) for k, v in id_us.iteritems()),
+        'hit_rate'  : dict((k, round(v, 3)) for k, v in hit_rate.iteritems()),
+    }
+
+def compare(report, baseline, tolerance=TOLERANCE):
+    """Return list of (name, baseline, result) more than tolerance slower."""
+    slower = []
+    for name, base in sorted(baseline['results'].iteritems()):
+        value = report['results'].get(name)
+        if value is not None and value < base * (1.0 - tolerance):
+            slower.append((name, base, value))
+    return slower
+
+#--------------------------------------------------------------------
+# M A I N
+#--------------------------------------------------------------------
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Game of Life benchmarks.")
+    parser.add_argument("--save", metavar="FILE",
+                        help="save results as baseline")
+    parser.add_argument("--check", metavar="FILE",
+                        help="compare results with baseline")
+    parser.add_argument("-t", "--tolerance", type=float, default=TOLERANCE,
+                        help="fraction slower than baseline allowed")
+    parser.add_argument("-r", "--repeat", type=int, default=REPEAT,
+                        help="runs of each benchmark, best is kept")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.repeat)
+    print json.dumps(report, indent=2, sort_keys=True)
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write('\n')
+    if args.check:
+        with open(args.check) as f:
+            baseline = json.load(f)
+        slower = compare(report, baseline, args.tolerance)
+        for name, base, value in slower:
+            sys.stderr.write("SLOWER {0}: {1:.1f} -> {2:.1f} ({3:+.0%})\n".format(
+                name, base, value, value/base - 1.0))
+        if slower:
+            sys.exit(1)
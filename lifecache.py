@@ -0,0 +1,191 @@
+#===============================================================================
+# lifecache.py
+#
+# Memoized transitions for Conway's Game of Life.
+#
+# Random soups settle into a small set of common states, so the successor of
+# a state is often one that has been worked out before. TransitionCache is a
+# bounded LRU map from a state to its successor, with hit and miss counters.
+#
+# CachedLife wraps any engine and caches whole universe transitions by
+# universe ID. TileLife caches the transition of each TILE x TILE block from
+# the block plus its one cell border, so partly repeated universes also hit.
+#
+# NOTE: a cache lookup costs more than a BitLife step, so these pay off for
+# the slower engines. CachedLife wraps ListLife unless told otherwise.
+#===============================================================================
+from collections import OrderedDict
+
+from listlife import ListLife
+from bitlife import BitLife, words_to_uni, uni_to_words, words_to_id, id_to_words, pad_words
+from liferules import CONWAY
+
+NX = 16
+NY = 16
+TILE = 4            # tile size for TileLife
+MAX_SIZE = 100000   # maximum cached transitions
+
+class TransitionCache():
+    """Bounded LRU map from a state to its successor."""
+
+    def __init__(self, max_size=MAX_SIZE):
+        self.max_size = max_size
+        self.table = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return cached successor of key, or None."""
+        value = self.table.pop(key, None)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.table[key] = value
+        return value
+
+    def put(self, key, value):
+        """Store successor of key, forgetting the least recently used."""
+        self.table[key] = value
+        if len(self.table) > self.max_size:
+            self.table.popitem(last=False)
+
+    def clear(self, ):
+        self.table.clear()
+        self.hits = 0
+        self.misses = 0
+
+class CachedLife():
+    """Engine wrapper caching whole universe transitions by universe ID."""
+
+    def __init__(self, nx=NX, ny=NY, engine=ListLife, max_size=MAX_SIZE, rule=CONWAY, wrap=False):
+        self.nx = nx
+        self.ny = ny
+        self.engine = engine(nx, ny, rule=rule, wrap=wrap)
+        self.cache = TransitionCache(max_size)
+        self.id = self.engine.get_id()
+        self.stale = False  # engine is behind self.id
+
+    def __sync(self, ):
+        """Bring wrapped engine up to the current universe."""
+        if self.stale:
+            words = id_to_words(self.id, self.nx, self.ny)
+            self.engine.set_universe(words_to_uni(words, self.nx, self.ny))
+            self.stale = False
+
+    def set_universe(self, uni):
+        """Set universe from (nx+2)x(ny+2) list of lists with border."""
+        self.engine.set_universe(uni)
+        self.id = self.engine.get_id()
+        self.stale = False
+
+    def set_id(self, ID):
+        """Set universe from universe ID."""
+        self.id = ID
+        self.stale = True
+
+    def get_universe(self, ):
+        """Return universe as (nx+2)x(ny+2) list of lists with border."""
+        self.__sync()
+        return self.engine.get_universe()
+
+    def get_cell(self, x, y):
+        """Return value of cell at x, y."""
+        return (self.id >> (x*self.ny + y)) & 0x01
+
+    def get_id(self, ):
+        """Return unique 2**(nx*ny) bit integer value."""
+        return self.id
+
+    def step(self, ):
+        """Life goes on, from the cache when possible."""
+        nxt = self.cache.get(self.id)
+        if nxt is None:
+            self.__sync()
+            self.engine.step()
+            nxt = self.engine.get_id()
+            self.cache.put(self.id, nxt)
+        else:
+            self.stale = True
+        self.id = nxt
+
+class TileLife():
+    """Engine stepping TILE x TILE blocks through a transition cache.
+
+    The key for a block is the (TILE+2) x (TILE+2) window around it, packed
+    like a universe ID. Misses are worked out with a small BitLife. nx and
+    ny must be multiples of tile. The row words and padded words are
+    allocated once and filled in place each step.
+    """
+
+    def __init__(self, nx=NX, ny=NY, tile=TILE, max_size=MAX_SIZE, rule=CONWAY, wrap=False):
+        if nx % tile or ny % tile:
+            raise ValueError("Board size must be a multiple of tile size.")
+        self.nx = nx
+        self.ny = ny
+        self.tile = tile
+        self.wrap = wrap
+        self.cache = TransitionCache(max_size)
+        self.kernel = BitLife(tile+2, tile+2, rule)
+        self.skip_empty = 0 not in self.kernel.rule.birth
+        self.state = 0
+        self.words = [0] * nx
+        self.padded = [0] * (nx+2)
+
+    def set_universe(self, uni):
+        """Set universe from (nx+2)x(ny+2) list of lists with border."""
+        self.state = words_to_id(uni_to_words(uni, self.nx, self.ny), self.ny)
+
+    def set_id(self, ID):
+        """Set universe from universe ID."""
+        self.state = ID
+
+    def get_universe(self, ):
+        """Return universe as (nx+2)x(ny+2) list of lists with border."""
+        return words_to_uni(id_to_words(self.state, self.nx, self.ny), self.nx, self.ny)
+
+    def get_cell(self, x, y):
+        """Return value of cell at x, y."""
+        return (self.state >> (x*self.ny + y)) & 0x01
+
+    def get_id(self, ):
+        """Return unique 2**(nx*ny) bit integer value."""
+        return self.state
+
+    def __next_tile(self, key):
+        """Return next generation of inner tile for window key."""
+        t = self.tile
+        w = t + 2
+        mask = (1 << t) - 1
+        self.kernel.set_id(key)
+        self.kernel.step()
+        window = self.kernel.get_id()
+        tile = 0
+        for i in xrange(t):
+            tile |= ((window >> ((i+1)*w + 1)) & mask) << (i*t)
+        return tile
+
+    def step(self, ):
+        """Life goes on, one tile at a time."""
+        t = self.tile
+        w = t + 2
+        ny = self.ny
+        wmask = (1 << w) - 1
+        tmask = (1 << t) - 1
+        words = pad_words(id_to_words(self.state, self.nx, ny, self.words),
+                          ny, self.wrap, self.padded)
+        new = 0
+        for x0 in xrange(0, self.nx, t):
+            for y0 in xrange(0, ny, t):
+                key = 0
+                for i in xrange(w):
+                    key |= ((words[x0+i] >> y0) & wmask) << (i*w)
+                if not key and self.skip_empty:
+                    continue
+                tile = self.cache.get(key)
+                if tile is None:
+                    tile = self.__next_tile(key)
+                    self.cache.put(key, tile)
+                for i in xrange(t):
+                    new |= ((tile >> (i*t)) & tmask) << ((x0+i)*ny + y0)
+        self.state = new
\ No newline at end of file
@@ -13,21 +13,89 @@
 #         |        |
 #         +--------+
 #
+# The matrix and ADC can be swapped for the stand-ins in headless.py to run
+# without hardware.
+#
+# The knobs are sampled on a background thread at a fixed rate, so reading
+# a knob returns a cached value and never waits on SPI.
+#
 # 2017-02-18
 # Carter Nelson
 #===============================================================================
-import Adafruit_GPIO.SPI as SPI
-import Adafruit_MCP3008
+import threading
+
+try:
+    import Adafruit_GPIO.SPI as SPI
+    import Adafruit_MCP3008
+except ImportError:
+    pass  # no hardware, see headless.py
 import matrix16x16
 
+NUM_KNOBS   = 3     # ADC channels with knobs
+MAX_ADC     = 1023  # full scale ADC value
+SAMPLE_RATE = 20    # knob samples per second
+SMOOTHING   = 0.3   # weight of new sample in running average
+DEADBAND    = 4     # smallest change in ADC counts that is reported
+
+class KnobSampler(threading.Thread):
+    """Thread for polling the knobs and caching smoothed values."""
+
+    def __init__(self, read, channels=NUM_KNOBS, rate=SAMPLE_RATE):
+        threading.Thread.__init__(self, name="KnobSampler")
+        self.daemon = True
+        self.read = read
+        self.period = 1.0 / rate
+        self.stopped = threading.Event()
+        self.listeners = []
+        self.smooth = [float(read(chan)) for chan in xrange(channels)]
+        self.values = [int(round(v)) for v in self.smooth]
+
+    def add_listener(self, listener):
+        """Call listener(chan, value) whenever a knob value changes."""
+        self.listeners.append(listener)
+
+    def sample(self, ):
+        """Read all channels once and report any that changed."""
+        for chan, avg in enumerate(self.smooth):
+            avg += SMOOTHING * (self.read(chan) - avg)
+            self.smooth[chan] = avg
+            value = int(round(avg))
+            old = self.values[chan]
+            if abs(value - old) >= DEADBAND or \
+               (value != old and value in (0, MAX_ADC)):
+                self.values[chan] = value
+                for listener in self.listeners:
+                    listener(chan, value)
+
+    def stop(self, ):
+        """Stop sampling."""
+        self.stopped.set()
+
+    def run(self, ):
+        """Don't call directly. Called when thread is started."""
+        while not self.stopped.wait(self.period):
+            try:
+                self.sample()
+            except IOError:
+                pass  # try again next time
+
 class LifeDisplay():
     """Class for interfacing to Raspberry Pi with 16x16 LED Matrix and
        ADC attached to potentiometers."""
     
-    def __init__(self, brightness=15):
-        self.disp = matrix16x16.Matrix16x16(brightness=brightness)
+    def __init__(self, brightness=15, disp=None, adc=None):
+        """disp and adc default to the real hardware, see headless.py for
+        stand-ins."""
+        if disp is None:
+            disp = matrix16x16.Matrix16x16(brightness=brightness)
+        self.disp = disp
         
-        self.mcp = Adafruit_MCP3008.MCP3008(spi=SPI.SpiDev(0, 0))
+        if adc is None:
+            adc = Adafruit_MCP3008.MCP3008(spi=SPI.SpiDev(0, 0))
+        self.mcp = adc
+        
+        self.knobs = KnobSampler(self.mcp.read_adc)
+        self.knobs.start()
 
     #---------------------------------------------------------------
     #                         M A T R I X
@@ -41,6 +109,9 @@ class LifeDisplay():
     def set_pixel(self, x, y, value):
         self.disp.set_pixel(x, y, value)
 
+    def set_frame(self, frame):
+        self.disp.set_frame(frame)
+
     def set_brightness(self, brightness):
         self.disp.set_brightness(brightness)
 
@@ -48,11 +119,13 @@ class LifeDisplay():
     #                            A D C
     #---------------------------------------------------------------
     def get_raw_knobs(self, ):
-        """Return the raw ADC values of the 3 knobs."""
-        return (self.mcp.read_adc(0),
-                self.mcp.read_adc(1),
-                self.mcp.read_adc(2))
+        """Return the ADC values of the 3 knobs."""
+        return tuple(self.knobs.values)
     
     def read_adc(self, chan):
-        """Return the raw ADC value for the given channel."""
-        return self.mcp.read_adc(chan)
\ No newline at end of file
+        """Return the ADC value for the given channel."""
+        return self.knobs.values[chan]
+    
+    def add_knob_listener(self, listener):
+        """Call listener(chan, value) from sampler thread on knob change."""
+        self.knobs.add_listener(listener)
\ No newline at end of file
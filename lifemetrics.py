@@ -0,0 +1,122 @@
+#===============================================================================
+# lifemetrics.py
+#
+# Timing and counters for the GOL main loop.
+#
+# Each phase of a frame is timed into a fixed size histogram with power of
+# two buckets, bucket i counting times of 2**(i-1) to 2**i microseconds and
+# the last one everything longer. Recording a time is a few list operations,
+# so it can stay on in the field. The phases are:
+#
+#       step        engine.step()
+#       id          getting the universe ID
+#       cycle       cycle detection
+#       render      building the frame and setting the display buffers
+#       i2c         write_display() to the matrix
+#       overshoot   how late the frame scheduler woke up
+#
+# and the counters:
+#
+#       generations     generations stepped
+#       restarts        new universes, from auto restart or set_universe()
+#       i2c_errors      IOErrors writing to the matrix, which GOL ignores
+#
+# GOL is given a Metrics, or None to skip all of it. Every log_every secs a
+# one line summary is written to out, with each phase as p50/p99/max times.
+#===============================================================================
+import sys
+import time
+
+PHASES      = ('step', 'id', 'cycle', 'render', 'i2c', 'overshoot')
+COUNTERS    = ('generations', 'restarts', 'i2c_errors')
+BUCKETS     = 22    # up to 2**20 us, about 1 sec, then overflow
+LOG_EVERY   = 60.0  # secs between log lines, 0 for none
+
+class Histogram():
+    """Fixed size histogram of durations in power of two microsecond buckets."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.counts = [0] * buckets
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, secs):
+        """Record a duration in secs."""
+        if secs < 0:
+            secs = 0.0
+        self.counts[min(int(secs * 1e6).bit_length(), len(self.counts) - 1)] += 1
+        self.count += 1
+        self.total += secs
+        if secs > self.max:
+            self.max = secs
+
+    def percentile(self, p):
+        """Return upper bound in microseconds of bucket holding percentile p,
+        at most the longest time seen."""
+        if not self.count:
+            return 0
+        rank = p / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                break
+        return min(1 << i, int(1e6 * self.max))
+
+    def summary(self, ):
+        """Return dict of count, times in microseconds and bucket counts."""
+        return {
+            'count'     : self.count,
+            'mean_us'   : int(1e6 * self.total / self.count) if self.count else 0,
+            'p50_us'    : self.percentile(50),
+            'p99_us'    : self.percentile(99),
+            'max_us'    : int(1e6 * self.max),
+            'buckets'   : list(self.counts),
+        }
+
+class Metrics():
+    """Phase histograms and counters for the GOL main loop."""
+
+    def __init__(self, log_every=LOG_EVERY, out=sys.stdout, clock=time.time):
+        self.clock = clock
+        self.log_every = log_every
+        self.out = out
+        self.phases = dict((phase, Histogram()) for phase in PHASES)
+        self.counters = dict((name, 0) for name in COUNTERS)
+        self.started = clock()
+        self.next_log = self.started + log_every
+
+    def add(self, phase, secs):
+        """Record duration in secs of a phase."""
+        self.phases[phase].add(secs)
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def tick(self, ):
+        """Count a generation, and write the log line when due."""
+        self.counters['generations'] += 1
+        if self.log_every:
+            now = self.clock()
+            if now >= self.next_log:
+                self.next_log = now + self.log_every
+                self.out.write(self.log_line() + '\n')
+                self.out.flush()
+
+    def snapshot(self, ):
+        """Return dict of everything, for the /metrics handler."""
+        return {
+            'uptime'    : round(self.clock() - self.started, 1),
+            'counters'  : dict(self.counters),
+            'phases'    : dict((phase, h.summary()) for phase, h in self.phases.iteritems()),
+        }
+
+    def log_line(self, ):
+        """Return one line summary of counters and phase times."""
+        parts = ['{0}={1}'.format(name, self.counters[name]) for name in COUNTERS]
+        for phase in PHASES:
+            h = self.phases[phase]
+            parts.append('{0}={1}/{2}/{3}us'.format(
+                phase, h.percentile(50), h.percentile(99), int(1e6 * h.max)))
+        return 'metrics ' + ' '.join(parts)
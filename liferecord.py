@@ -0,0 +1,176 @@
+#===============================================================================
+# liferecord.py
+#
+# Recording of everything the matrix shows, and replay of recordings.
+#
+# A recording is a file of fixed size frames, one per generation shown:
+#
+#       header      32 bytes, see HEADER below
+#       frames      32 bytes each, the 16 row words low byte first
+#       index       8 bytes per keyframe, I frame number, I generation
+#
+# A frame is exactly what Matrix16x16.set_frame() takes as 32 bytes, so a
+# replay hands slices of the memory mapped file straight to the matrix or
+# the frame stream with nothing to decode. Frame n is at 32 + 32*n, so
+# seeking is O(1).
+#
+# A keyframe is the first frame of a new universe, from a restart, a new
+# universe from the web or an edit, i.e. any frame whose generation does not
+# follow on from the last. The index lists them, so the generation of any
+# frame can be found, and a replay can skip from universe to universe.
+#
+# Recorder.record() is a GOL frame listener. Frames go through a large write
+# buffer, so recording keeps up with GOL at full speed. The index is written
+# and the header filled in by close(). A recording that was never closed
+# still replays, with its frames counted from the file size, as one run from
+# generation 1.
+#
+#       python liferecord.py run.rec                replay on the LED matrix
+#       python liferecord.py run.rec -s 1000 -r 0.05
+#===============================================================================
+import argparse
+import binascii
+import mmap
+import struct
+import time
+from bisect import bisect_right
+
+MAGIC       = 'GOLREC01'
+HEADER      = struct.Struct('<8sIIIQI')     # magic, frame size, frames,
+                                            # keyframes, index offset, start
+FRAME       = 32    # bytes per frame
+INDEX       = struct.Struct('<II')          # frame number, generation
+BUFFER      = 1 << 16   # write buffer (bytes)
+RATE        = 0.1   # default replay secs per frame
+
+def frame_bytes(frame):
+    """Return 32 bytes for a universe ID, row words or 32 bytes."""
+    if isinstance(frame, (int, long)):
+        return binascii.unhexlify('%064x' % frame)[::-1]
+    if isinstance(frame, (str, bytearray)):
+        return bytes(frame)
+    return struct.pack('<16H', *frame)
+
+class Recorder():
+    """Frame listener appending every frame shown to a recording."""
+
+    def __init__(self, filename, buffering=BUFFER):
+        self.file = open(filename, 'wb', buffering)
+        self.start = int(time.time())
+        self.file.write(HEADER.pack(MAGIC, FRAME, 0, 0, 0, self.start))
+        self.frames = 0
+        self.keyframes = []     # (frame number, generation)
+        self.generation = None  # of the last frame
+
+    def record(self, generation, frame):
+        """Record frame of generation. Add as a GOL frame listener."""
+        if self.generation is None or generation != self.generation + 1:
+            self.keyframes.append((self.frames, generation))
+        self.generation = generation
+        self.file.write(frame_bytes(frame))
+        self.frames += 1
+
+    def close(self, ):
+        """Write the index and header and close the file. Call once GOL has
+        stopped showing frames."""
+        f = self.file
+        offset = HEADER.size + FRAME * self.frames
+        for keyframe in self.keyframes:
+            f.write(INDEX.pack(*keyframe))
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, FRAME, self.frames, len(self.keyframes),
+                            offset, self.start))
+        f.close()
+
+class Recording():
+    """Memory mapped recording."""
+
+    def __init__(self, filename):
+        self.file = open(filename, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, size, frames, keyframes, offset, self.start = \
+            HEADER.unpack(self.map[:HEADER.size])
+        if magic != MAGIC or size != FRAME:
+            raise ValueError("Not a recording: {0}".format(filename))
+        if not offset:
+            # never closed, no index
+            frames = (len(self.map) - HEADER.size) // FRAME
+            keyframes = 0
+        self.frames = frames
+        self.keyframes = [INDEX.unpack_from(self.map, offset + INDEX.size*k)
+                          for k in xrange(keyframes)]
+        self.keyframe_numbers = [n for n, generation in self.keyframes]
+
+    def __len__(self, ):
+        return self.frames
+
+    def frame(self, n):
+        """Return 32 bytes of frame n."""
+        if not 0 <= n < self.frames:
+            raise IndexError("No frame {0}.".format(n))
+        start = HEADER.size + FRAME*n
+        return self.map[start:start+FRAME]
+
+    def generation(self, n):
+        """Return generation of frame n."""
+        k = bisect_right(self.keyframe_numbers, n) - 1
+        if k < 0:
+            return n + 1
+        first, generation = self.keyframes[k]
+        return generation + n - first
+
+    def next_keyframe(self, n):
+        """Return number of first keyframe after frame n, or None."""
+        k = bisect_right(self.keyframe_numbers, n)
+        if k < len(self.keyframes):
+            return self.keyframe_numbers[k]
+        return None
+
+    def close(self, ):
+        self.map.close()
+        self.file.close()
+
+def replay(recording, show, rate=RATE, start=0, stop=None, stopped=None):
+    """Call show(generation, frame) for frames start to stop, rate secs
+    apart, e.g. with GOL.show() or FrameStream.publish(). Ends early once
+    the stopped Event, if given, is set."""
+    stop = len(recording) if stop is None else min(stop, len(recording))
+    due = time.time()
+    for n in xrange(start, stop):
+        if stopped and stopped.is_set():
+            break
+        show(recording.generation(n), recording.frame(n))
+        due += rate
+        delay = due - time.time()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            due = time.time()
+
+#--------------------------------------------------------------------
+# M A I N
+#--------------------------------------------------------------------
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Replay a recording on the LED matrix.")
+    parser.add_argument("filename", help="recording to replay")
+    parser.add_argument("-s", "--start", type=int, default=0,
+                        help="first frame to show")
+    parser.add_argument("-n", "--frames", type=int, default=None,
+                        help="number of frames to show")
+    parser.add_argument("-r", "--rate", type=float, default=RATE,
+                        help="secs per frame")
+    args = parser.parse_args()
+
+    from matrix16x16 import Matrix16x16
+    matrix = Matrix16x16()
+    rec = Recording(args.filename)
+    print "{0} frames, {1} universes.".format(len(rec), len(rec.keyframes))
+    def show(generation, frame):
+        matrix.set_frame(frame)
+        matrix.write_display()
+    stop = None if args.frames is None else args.start + args.frames
+    try:
+        replay(rec, show, args.rate, args.start, stop)
+    except KeyboardInterrupt:
+        pass
+    rec.close()
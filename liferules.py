@@ -0,0 +1,111 @@
+#===============================================================================
+# liferules.py
+#
+# Life-like cellular automaton rules given as B/S rulestrings.
+#
+#       B3/S23          Conway's Game of Life
+#       B36/S23         HighLife
+#       B3678/S34678    Day & Night
+#
+# The digits after B are the neighbor counts that bring a dead cell to life,
+# the digits after S the counts that keep a live cell alive. "S23/B3" and the
+# older "23/3" (survive/birth) forms are also accepted, as are the names in
+# RULES.
+#
+# A rule is compiled once into the forms the engines use:
+#
+#   * next_state[alive][N], a 2x9 table for the cell by cell engines
+#   * bitlogic(b, z0, h0, h1, h2), a function combining the bit planes of the
+#     neighbor count (N = z0 + 2*h0 + 4*h1 + 8*h2) for the bitboard engine
+#===============================================================================
+import re
+
+CONWAY = 'B3/S23'
+
+RULES = {
+    'conway'    : CONWAY,
+    'life'      : CONWAY,
+    'highlife'  : 'B36/S23',
+    'daynight'  : 'B3678/S34678',
+    'seeds'     : 'B2/S',
+    'life34'    : 'B34/S34',
+    'maze'      : 'B3/S12345',
+    'replicator': 'B1357/S1357',
+}
+
+# expression for each 2 input truth table over (z0, b), index bits are
+# g(0,0), g(0,1), g(1,0), g(1,1)
+LOGIC2 = (None, '~(z0 | b)', 'b & ~z0', '~z0',
+          'z0 & ~b', '~b', 'z0 ^ b', '~(z0 & b)',
+          'z0 & b', '~(z0 ^ b)', 'b', 'b | ~z0',
+          'z0', 'z0 | ~b', 'z0 | b', '')
+
+def parse_rule(rulestring):
+    """Return (birth, survive) sets of neighbor counts for rulestring."""
+    s = RULES.get(rulestring.lower(), rulestring).upper().replace(' ', '')
+    m = re.match(r'^B([0-8]*)/S([0-8]*)$', s)
+    if m:
+        birth, survive = m.groups()
+    else:
+        m = re.match(r'^S([0-8]*)/B([0-8]*)$', s) or \
+            re.match(r'^([0-8]*)/([0-8]*)$', s)
+        if not m:
+            raise ValueError("Bad rulestring {0}.".format(rulestring))
+        survive, birth = m.groups()
+    return frozenset(int(n) for n in birth), frozenset(int(n) for n in survive)
+
+def compile_bitlogic(birth, survive):
+    """Return function giving next state from count bit planes."""
+    terms = []
+    for p in xrange(5):
+        # counts 2p (z0=0) and 2p+1 (z0=1), p=4 is the count of 8
+        n0, n1 = 2*p, 2*p+1
+        if p == 4:
+            n1 = n0     # z0 is always 0 for a count of 8
+        t = (n0 in birth) | (n0 in survive) << 1 | \
+            (n1 in birth) << 2 | (n1 in survive) << 3
+        g = LOGIC2[t]
+        if g is None:
+            continue
+        if p == 4:
+            high = ['h2']
+        else:
+            high = ['h0' if p & 1 else '~h0',
+                    'h1' if p & 2 else '~h1',
+                    '~h2']
+        if g:
+            high.append('({0})'.format(g))
+        terms.append(' & '.join(high))
+    expr = ' | '.join('({0})'.format(term) for term in terms) or '0'
+    return eval('lambda b, z0, h0, h1, h2: ' + expr)
+
+class Rule():
+    """Compiled Life-like rule."""
+
+    def __init__(self, birth, survive):
+        self.birth = frozenset(birth)
+        self.survive = frozenset(survive)
+        self.name = 'B{0}/S{1}'.format(''.join(str(n) for n in sorted(self.birth)),
+                                       ''.join(str(n) for n in sorted(self.survive)))
+        self.next_state = (tuple(int(N in self.birth) for N in xrange(9)),
+                           tuple(int(N in self.survive) for N in xrange(9)))
+        self.bitlogic = compile_bitlogic(self.birth, self.survive)
+
+    def __repr__(self):
+        return "Rule('{0}')".format(self.name)
+
+    def next(self, alive, N):
+        """Return next state of cell for neighbor count N."""
+        return self.next_state[alive][N]
+
+_compiled = {}
+
+def get_rule(rule=CONWAY):
+    """Return compiled Rule for a rulestring, compiling it only once."""
+    if isinstance(rule, Rule):
+        return rule
+    birth, survive = parse_rule(rule)
+    key = (birth, survive)
+    if key not in _compiled:
+        _compiled[key] = Rule(birth, survive)
+    return _compiled[key]
\ No newline at end of file
@@ -0,0 +1,120 @@
+#===============================================================================
+# lifestats.py
+#
+# Storage of universe stats in the life_stats.db SQLite database.
+#
+# Each finished universe is stored as its starting universe ID, the number
+# of generations it ran for and the period it settled into (0 if it died).
+# IDs are stored as big endian BLOBs (32 bytes for 16x16) so they sort like
+# the numbers.
+#
+# StatsWriter takes records from the simulation without blocking it and
+# writes them in batches on its own thread, with the database in WAL mode so
+# each batch is a single cheap commit.
+#===============================================================================
+import sqlite3
+import threading
+import Queue
+from time import time
+
+FILENAME    = 'life_stats.db'
+MAX_QUEUE   = 1000  # records waiting to be written before dropping
+BATCH       = 100   # most records written per transaction
+FLUSH       = 5.0   # longest a record waits to be written (secs)
+
+SQL_CREATE = '''CREATE TABLE IF NOT EXISTS STATS (ID BLOB PRIMARY KEY,
+                                                GENERATIONS INT,
+                                                PERIOD INT);'''
+SQL_INSERT = '''INSERT OR REPLACE INTO STATS (ID, GENERATIONS, PERIOD)
+                VALUES (?, ?, ?);'''
+
+def id_to_blob(ID):
+    """Return universe ID as a BLOB."""
+    h = '%064x' % ID
+    if len(h) % 2:
+        h = '0' + h
+    return buffer(h.decode('hex'))
+
+def blob_to_id(blob):
+    """Return universe ID for a BLOB."""
+    return int(str(blob).encode('hex'), 16)
+
+def connect(filename=FILENAME):
+    """Return connection to stats database, creating table if needed."""
+    conn = sqlite3.connect(filename)
+    conn.execute('PRAGMA journal_mode=WAL;')
+    conn.execute('PRAGMA synchronous=NORMAL;')
+    conn.execute(SQL_CREATE)
+    return conn
+
+def store_stats(conn, records):
+    """Store (ID, generations, period) records in one transaction."""
+    with conn:
+        conn.executemany(SQL_INSERT,
+                         [(id_to_blob(ID), gens, p) for ID, gens, p in records])
+
+class StatsWriter(threading.Thread):
+    """Thread for storing stats records in batched transactions.
+
+    store() never blocks. Records are queued and written by the thread in
+    one transaction per batch. If the queue is full the record is dropped
+    and counted, so logging can never hold up the caller.
+    """
+
+    def __init__(self, filename=FILENAME, max_queue=MAX_QUEUE, batch=BATCH,
+                 flush=FLUSH):
+        threading.Thread.__init__(self, name="StatsWriter")
+        self.daemon = True
+        self.filename = filename
+        self.queue = Queue.Queue(maxsize=max_queue)
+        self.batch = batch
+        self.flush = flush
+        self.stopped = threading.Event()
+        self.written = 0
+        self.dropped = 0
+
+    def store(self, ID, generations, period):
+        """Queue a record. Return False if it had to be dropped."""
+        try:
+            self.queue.put_nowait((ID, generations, period))
+            return True
+        except Queue.Full:
+            self.dropped += 1
+            return False
+
+    def stop(self, ):
+        """Write whatever is queued and stop."""
+        self.stopped.set()
+        try:
+            self.queue.put_nowait(None)  # wake the thread
+        except Queue.Full:
+            pass
+
+    def run(self, ):
+        """Don't call directly. Called when thread is started."""
+        conn = connect(self.filename)
+        try:
+            while not (self.stopped.is_set() and self.queue.empty()):
+                records = self.__next_batch()
+                if records:
+                    store_stats(conn, records)
+                    self.written += len(records)
+        finally:
+            conn.close()
+
+    def __next_batch(self, ):
+        """Return up to batch records, waiting up to flush secs for them."""
+        records = []
+        deadline = time() + self.flush
+        while len(records) < self.batch:
+            timeout = deadline - time()
+            if timeout <= 0:
+                break
+            try:
+                record = self.queue.get(True, timeout)
+            except Queue.Empty:
+                break
+            if record is None:
+                break
+            records.append(record)
+        return records
@@ -0,0 +1,98 @@
+#===============================================================================
+# listlife.py
+#
+# Reference engine for Conway's Game of Life. The universe is held as a list
+# of bytearray columns with a single border of dead cells, indexed U[x][y].
+# There are two such buffers, each step writes the next generation into the
+# spare one and swaps them, so stepping allocates no lists.
+#
+# This is the original stepping code from GOL, kept as the baseline that the
+# faster engines are checked against.
+#===============================================================================
+
+from bitlife import words_to_uni, id_to_words
+from liferules import CONWAY, get_rule
+
+NX = 16
+NY = 16
+
+class ListLife():
+    """List of lists Game of Life engine."""
+
+    def __init__(self, nx=NX, ny=NY, rule=CONWAY, wrap=False):
+        self.nx = nx
+        self.ny = ny
+        self.wrap = wrap
+        self.rule = get_rule(rule)
+        self.U = [bytearray(ny+2) for x in xrange(nx+2)]
+        self.UU = [bytearray(ny+2) for x in xrange(nx+2)]
+        self.id = 0
+
+    def set_universe(self, uni):
+        """Set universe from (nx+2)x(ny+2) list of lists with border."""
+        for col, src in zip(self.U, uni):
+            col[:] = bytearray(src)
+        self.id = self.__compute_id()
+
+    def set_id(self, ID):
+        """Set universe from universe ID."""
+        self.set_universe(words_to_uni(id_to_words(ID, self.nx, self.ny), self.nx, self.ny))
+
+    def get_universe(self, ):
+        """Return universe as (nx+2)x(ny+2) list of lists with border."""
+        return words_to_uni(id_to_words(self.id, self.nx, self.ny), self.nx, self.ny)
+
+    def get_cell(self, x, y):
+        """Return value of cell at x, y."""
+        return self.U[x+1][y+1]
+
+    def get_id(self, ):
+        """Return unique 2**(nx*ny) bit integer value."""
+        return self.id
+
+    def __compute_id(self, ):
+        """Return universe ID computed from scratch."""
+        N = 0
+        ID = 0
+        for x in xrange(self.nx):
+            for y in xrange(self.ny):
+                if self.U[x+1][y+1]:
+                    ID |= 1 << N
+                N += 1
+        return ID
+
+    def __count_neighbors(self, x, y):
+        """Return neighbor count."""
+        U = self.U
+        return  U[x-1][y-1] + U[x][y-1] + U[x+1][y-1] + \
+                U[x-1][y]   +             U[x+1][y]   + \
+                U[x-1][y+1] + U[x][y+1] + U[x+1][y+1]
+
+    def __wrap_border(self, ):
+        """Copy opposite edges into the border, in place."""
+        U = self.U
+        nx, ny = self.nx, self.ny
+        U[0][1:ny+1] = U[nx][1:ny+1]
+        U[nx+1][1:ny+1] = U[1][1:ny+1]
+        for col in U:
+            col[0] = col[ny]
+            col[ny+1] = col[1]
+
+    def step(self, ):
+        """Life goes on, into the spare buffer which then swaps in. The new
+        universe ID is packed along the way."""
+        if self.wrap:
+            self.__wrap_border()
+        next_state = self.rule.next_state
+        U, UU = self.U, self.UU
+        ID = 0
+        bit = 0
+        for x in xrange(1,self.nx+1):
+            for y in xrange(1,self.ny+1):
+                N = self.__count_neighbors(x,y)
+                UU[x][y] = next_state[U[x][y]][N]
+                if UU[x][y]:
+                    ID |= 1 << bit
+                bit += 1
+        self.U, self.UU = UU, U
+        self.id = ID
\ No newline at end of file
@@ -16,19 +16,36 @@
 #        xx +--------+
 #         Lyy
 #
+# Whole frames can be set in one go with set_frame(), from either:
+#
+#   * a 256 bit universe ID, bit (x*16 + y) = pixel (x, y)
+#   * a list of 16 row words, word x bit y = pixel (x, y)
+#   * 32 bytes, the row words low byte first
+#
+# Lookup tables map each byte of the frame directly to the bits of the two
+# backpack buffers, so a frame takes about 32 byte stores.
+#
 # 2017-04-30
 # Carter Nelson
 #===============================================================================
-from Adafruit_LED_Backpack import Matrix8x16
+try:
+    from Adafruit_LED_Backpack import Matrix8x16
+except ImportError:
+    pass  # no hardware, see headless.MemoryMatrix
+
+EMPTY = bytearray(16)
 
 class Matrix16x16():
     """Class for interfacing to 16x16 LED matrix comprised of two Adafruit 16x8
     LED matrices.
     """
     
-    def __init__(self, bottom=0x70, top=0x71, brightness=15):
-        self.m1 = Matrix8x16.Matrix8x16(address=bottom)
-        self.m2 = Matrix8x16.Matrix8x16(address=top)
+    def __init__(self, bottom=0x70, top=0x71, brightness=15, backpack=None):
+        # backpack is the 8x16 driver class, see headless.MemoryBackpack
+        if backpack is None:
+            backpack = Matrix8x16.Matrix8x16
+        self.m1 = backpack(address=bottom)
+        self.m2 = backpack(address=top)
         
         self.m1.begin()
         self.m2.begin()
@@ -42,13 +59,93 @@ class Matrix16x16():
         self.m1.write_display()
         self.m2.write_display()
         
+        # last buffers sent to each backpack
+        self.sent1 = bytearray(self.m1.buffer)
+        self.sent2 = bytearray(self.m2.buffer)
+        
+        # frame lookup tables
+        self.layout = self.__probe_layout(self.m1)
+        self.word_lut = self.__build_lut(lambda n, bit: (n, bit))
+        self.raw256_lut = self.__build_lut(lambda n, bit: (15-bit, 15-n))
+        
+    def __probe_layout(self, m):
+        """Return {(x, y): (index, mask)} of backpack buffer for each pixel."""
+        layout = {}
+        for x in xrange(8):
+            for y in xrange(16):
+                m.clear()
+                m.set_pixel(x, y, 1)
+                for index, value in enumerate(m.buffer):
+                    if value:
+                        layout[(x, y)] = (index, value)
+        m.clear()
+        return layout
+        
+    def __locate(self, x, y):
+        """Return (backpack, index, mask) for pixel x, y. See set_pixel()."""
+        xx = 15 - y
+        yy = x
+        if xx < 8:
+            return (0,) + self.layout[(xx, yy)]
+        else:
+            return (1,) + self.layout[(xx-8, yy)]
+        
+    def __build_lut(self, pixel):
+        """Return table of frame bytes to buffer bits.
+        
+        pixel(n, bit) gives the x, y pixel for bit of 16 bit chunk n of the
+        frame. lut[2*n + half][value] is a tuple of (backpack, index, mask)
+        to OR into the buffers for that byte value.
+        """
+        lut = []
+        for b in xrange(32):
+            n, half = b >> 1, b & 0x01
+            table = [()]
+            for value in xrange(1, 256):
+                low = value & -value
+                bit = 8*half + low.bit_length() - 1
+                bp, index, mask = self.__locate(*pixel(n, bit))
+                merged = dict(((e[0], e[1]), e[2]) for e in table[value & ~low])
+                merged[(bp, index)] = merged.get((bp, index), 0) | mask
+                table.append(tuple((k[0], k[1], v) for k, v in merged.iteritems()))
+            lut.append(table)
+        return lut
+        
+    def __set_bytes(self, lut, frame):
+        """Fill buffers from 32 frame bytes using given lookup table."""
+        bufs = (self.m1.buffer, self.m2.buffer)
+        bufs[0][:] = EMPTY
+        bufs[1][:] = EMPTY
+        for b, value in enumerate(frame):
+            for bp, index, mask in lut[b][value]:
+                bufs[bp][index] |= mask
+        
     def clear(self, ):
         self.m1.clear()
         self.m2.clear()
         
-    def write_display(self, ):
-        self.m1.write_display()
-        self.m2.write_display()
+    def write_display(self, force=False):
+        """Send frame, skipping whatever has not changed since last sent."""
+        if force:
+            self.sent1[:] = [b ^ 0xFF for b in self.m1.buffer]
+            self.sent2[:] = [b ^ 0xFF for b in self.m2.buffer]
+        self.__write_changed(self.m1, self.sent1)
+        self.__write_changed(self.m2, self.sent2)
+        
+    def __write_changed(self, m, sent):
+        """Write the span of bytes that differ from those last sent."""
+        buf = m.buffer
+        if buf == sent:
+            return
+        first = 0
+        while buf[first] == sent[first]:
+            first += 1
+        last = len(buf) - 1
+        while buf[last] == sent[last]:
+            last -= 1
+        # display RAM address auto increments, so one block write does it
+        m._device.writeList(first, list(buf[first:last+1]))
+        sent[first:last+1] = buf[first:last+1]
         
     def set_pixel(self, x, y, value):
         xx = 15 - y
@@ -62,12 +159,20 @@ class Matrix16x16():
         self.m1.set_brightness(brightness)
         self.m2.set_brightness(brightness)
         
+    def set_frame(self, frame):
+        """Set whole frame from universe ID, row words or 32 bytes."""
+        if isinstance(frame, (int, long)):
+            frame = [(frame >> (8*b)) & 0xFF for b in xrange(32)]
+        elif isinstance(frame, str):
+            frame = bytearray(frame)
+        elif not isinstance(frame, bytearray):
+            frame = [v for word in frame for v in (word & 0xFF, word >> 8)]
+        self.__set_bytes(self.word_lut, frame)
+        
     def set_raw256(self, value):
-        self.clear()
-        for y in xrange(16):
-            for x in xrange(16):
-                self.set_pixel(15-x,15-y, value & 0x01)
-                value >>= 1
+        """Show 256 bit value in LED16x16ICONS format."""
+        self.__set_bytes(self.raw256_lut,
+                         [(value >> (8*b)) & 0xFF for b in xrange(32)])
         self.write_display()
         
     def bitmap2value(bmp):
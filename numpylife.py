@@ -0,0 +1,205 @@
+#===============================================================================
+# numpylife.py
+#
+# NumPy engine for Conway's Game of Life.
+#
+# The universe is held as a bool array indexed [x, y]. Neighbor counts are
+# summed from shifted views of a padded uint8 copy of the array, first the
+# 3 cell row sums and then 3 of those, so the whole board steps in a handful
+# of vectorized operations. Any leading axes are
+# treated as a batch of independent boards, so a stack of N boards with shape
+# (N, NX, NY) steps in a single call.
+#
+# NumpyLife keeps two boards and steps from one into the other. The padded
+# copy, sums and rule scratch are preallocated in a BoardStepper, so no
+# arrays are allocated in the steady state loop.
+#
+# Meant for large universes and batch runs off the device.
+#===============================================================================
+import numpy as np
+
+from liferules import CONWAY, get_rule
+
+NX = 16
+NY = 16
+
+def random_boards(n, fill, nx=NX, ny=NY):
+    """Return (n, nx, ny) array of random boards with given percent fill."""
+    return (np.random.random_sample((n, nx, ny)) < 0.01 * fill).astype(np.uint8)
+
+def board_id(board):
+    """Return universe ID for a single (nx, ny) board."""
+    bits = board.ravel()[::-1]
+    pad = -len(bits) % 8
+    ID = int(np.packbits(bits).tostring().encode('hex') or '0', 16)
+    return ID >> pad
+
+_compiled = {}
+
+def compile_rule(rule=CONWAY):
+    """Return function(boards, N, out, t, u) writing next boards into out.
+
+    The rule is turned into array comparisons, B3/S23 becoming
+    (N == 3) | (boards & (N == 2)), evaluated in place with t and u as
+    scratch. out, t and u are bool. Each rule is compiled only once.
+    """
+    rule = get_rule(rule)
+    if rule.name not in _compiled:
+        _compiled[rule.name] = _compile_rule(rule)
+    return _compiled[rule.name]
+
+def _compile_rule(rule):
+    """Return in place comparison function for a Rule, see compile_rule()."""
+    lines = ['def next_boards(boards, N, out, t, u):',
+             '    out[...] = False']
+    def counts(ns):
+        ns = sorted(ns)
+        lines.append('    np.equal(N, {0}, out=t)'.format(ns[0]))
+        for n in ns[1:]:
+            lines.append('    np.equal(N, {0}, out=u)'.format(n))
+            lines.append('    t |= u')
+    if rule.birth & rule.survive:
+        counts(rule.birth & rule.survive)
+        lines.append('    out |= t')
+    if rule.survive - rule.birth:
+        counts(rule.survive - rule.birth)
+        lines.append('    np.logical_and(t, boards, out=t)')
+        lines.append('    out |= t')
+    if rule.birth - rule.survive:
+        counts(rule.birth - rule.survive)
+        lines.append('    np.greater(t, boards, out=t)     # t and not boards')
+        lines.append('    out |= t')
+    lines.append('    return out')
+    namespace = {'np': np}
+    exec '\n'.join(lines) in namespace
+    return namespace['next_boards']
+
+CONWAY_RULE = compile_rule()
+
+def id_board(ID, nx=NX, ny=NY):
+    """Return (nx, ny) board for universe ID."""
+    nbytes = (nx*ny + 7) // 8
+    data = ('%0*x' % (2*nbytes, ID)).decode('hex')
+    bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8))[::-1]
+    return bits[:nx*ny].reshape((nx, ny))
+
+class BoardStepper():
+    """Buffers for stepping boards of one shape, (..., nx, ny).
+
+    The padded copy, row sums, neighbor counts and rule scratch, and the
+    views into them, are made once here and reused by every step.
+    """
+
+    def __init__(self, shape, wrap=False):
+        nx, ny = shape[-2:]
+        lead = tuple(shape[:-2])
+        self.padded = np.zeros(lead + (nx+2, ny+2), dtype=np.uint8)
+        self.rows = np.zeros(lead + (nx, ny+2), dtype=np.uint8)
+        self.N = np.zeros(lead + (nx, ny), dtype=np.uint8)
+        self.t = np.zeros(lead + (nx, ny), dtype=bool)
+        self.u = np.zeros(lead + (nx, ny), dtype=bool)
+        P = self.padded
+        R = self.rows
+        self.inner = P[..., 1:-1, 1:-1]
+        self.row_views = (P[..., 0:-2, :], P[..., 1:-1, :], P[..., 2:, :])
+        self.col_views = (R[..., 0:-2], R[..., 1:-1], R[..., 2:])
+        # (border, opposite edge) pairs to copy for a torus
+        self.edges = []
+        if wrap:
+            self.edges = [(P[..., 0, 1:-1], P[..., -2, 1:-1]),
+                          (P[..., -1, 1:-1], P[..., 1, 1:-1]),
+                          (P[..., :, 0], P[..., :, -2]),
+                          (P[..., :, -1], P[..., :, 1])]
+
+    def step(self, boards, out, rule):
+        """Write next generation of boards into bool out and return it."""
+        inner = self.inner
+        R = self.rows
+        N = self.N
+        r0, r1, r2 = self.row_views
+        c0, c1, c2 = self.col_views
+        inner[...] = boards
+        for border, edge in self.edges:
+            border[...] = edge
+        np.add(r0, r1, out=R)
+        R += r2
+        np.add(c0, c1, out=N)
+        N += c2
+        N -= inner
+        return rule(boards, N, out, self.t, self.u)
+
+def step_boards(boards, stepper=None, rule=CONWAY_RULE, wrap=False):
+    """Return next generation for array of boards of shape (..., nx, ny).
+
+    stepper is an optional BoardStepper for the shape of boards, reused
+    between calls to avoid allocating its buffers every step. rule is from
+    compile_rule(). With wrap the boards are tori.
+    """
+    if stepper is None:
+        stepper = BoardStepper(boards.shape, wrap)
+    out = np.empty(boards.shape, dtype=bool)
+    return stepper.step(boards, out, rule).view(np.uint8)
+
+class NumpyLife():
+    """NumPy Game of Life engine.
+
+    With batch=None a single (nx, ny) board is held and the usual engine
+    interface applies. With batch=n an (n, nx, ny) stack of boards is held,
+    see set_boards() and get_ids().
+    """
+
+    def __init__(self, nx=NX, ny=NY, batch=None, rule=CONWAY, wrap=False):
+        self.nx = nx
+        self.ny = ny
+        self.wrap = wrap
+        self.rule = compile_rule(rule)
+        lead = () if batch is None else (batch,)
+        self.state = np.zeros(lead + (nx, ny), dtype=bool)
+        self.spare = np.zeros(lead + (nx, ny), dtype=bool)
+        self.stepper = BoardStepper(self.state.shape, wrap)
+        self.id = None
+
+    def set_universe(self, uni):
+        """Set universe from (nx+2)x(ny+2) list of lists with border."""
+        self.state[...] = np.array(uni, dtype=bool)[1:-1, 1:-1]
+        self.id = None
+
+    def get_universe(self, ):
+        """Return universe as (nx+2)x(ny+2) list of lists with border."""
+        UU = np.zeros((self.nx+2, self.ny+2), dtype=np.uint8)
+        UU[1:-1, 1:-1] = self.state
+        return UU.tolist()
+
+    def set_id(self, ID):
+        """Set universe from universe ID."""
+        self.state[...] = id_board(ID, self.nx, self.ny)
+        self.id = None
+
+    def set_boards(self, boards):
+        """Set all boards from array of shape (..., nx, ny)."""
+        self.state[...] = boards
+        self.id = None
+
+    def get_boards(self, ):
+        """Return uint8 array of all boards. It is overwritten two steps later."""
+        return self.state.view(np.uint8)
+
+    def get_cell(self, x, y):
+        """Return value of cell at x, y."""
+        return int(self.state[x, y])
+
+    def get_id(self, ):
+        """Return unique 2**(nx*ny) bit integer value. Packed once per step."""
+        if self.id is None:
+            self.id = board_id(self.state)
+        return self.id
+
+    def get_ids(self, ):
+        """Return list of universe IDs for a batch of boards."""
+        return [board_id(board) for board in self.state]
+
+    def step(self, ):
+        """Life goes on, into the spare board which then swaps in."""
+        self.stepper.step(self.state, self.spare, self.rule)
+        self.state, self.spare = self.spare, self.state
+        self.id = None
@@ -0,0 +1,161 @@
+#===============================================================================
+# sessions.py
+#
+# Client sessions for the web interface.
+#
+# Any number of browsers can watch at once. Each open page holds a session
+# over the /ws_session websocket. Editing is granted to one session at a time
+# by a lease that lasts LEASE seconds from the last edit. If the holder goes
+# idle or away, even without the websocket closing cleanly, the lease simply
+# runs out and someone else can take it.
+#
+# Messages are JSON. The page sends {"op": ...}:
+#
+#       acquire     ask for the editor lease
+#       renew       keep the lease
+#       release     give the lease up
+#       edit        {"cells": [[x, y, value], ...]} set cells as one batch
+#       status      nothing, the page's heartbeat
+#
+# and every reply is the session status, see SessionManager.status().
+#
+# Edits can also be sent as binary messages, numbered after the frame kinds
+# in framestream:
+#
+#       TOGGLES     B kind=2, B per cell 16*y + x       cells to flip
+#       BOARD       B kind=3, 16 H row words            whole LED view
+#
+# Either way a batch is applied to GOL as one change and shown with one
+# display write.
+#
+# Everything here runs on the IOLoop, so no locking is needed.
+#===============================================================================
+import json
+import struct
+import time
+import uuid
+
+import tornado.websocket
+
+from gol import TOGGLE
+
+LEASE   = 30.0      # editor lease length (secs)
+TOGGLES = 2         # binary edit kinds, see above
+BOARD   = 3
+
+class SessionManager():
+    """Connected sessions and the single editor lease."""
+
+    def __init__(self, lease=LEASE, clock=time.time):
+        self.lease = lease
+        self.clock = clock
+        self.sessions = set()
+        self.editor = None      # session id holding the lease
+        self.expires = 0
+
+    def join(self, ):
+        """Return id of a new session."""
+        sid = uuid.uuid4().hex
+        self.sessions.add(sid)
+        return sid
+
+    def leave(self, sid):
+        self.sessions.discard(sid)
+        self.release(sid)
+
+    def holder(self, ):
+        """Return session id holding the lease, or None."""
+        if self.editor and self.clock() >= self.expires:
+            self.editor = None
+        return self.editor
+
+    def acquire(self, sid):
+        """Grant or renew lease for session. Return True if it holds it."""
+        holder = self.holder()
+        if sid not in self.sessions or holder not in (None, sid):
+            return False
+        self.editor = sid
+        self.expires = self.clock() + self.lease
+        return True
+
+    def renew(self, sid):
+        """Renew lease if session holds it. Return True if it does."""
+        return self.holder() == sid and self.acquire(sid)
+
+    def release(self, sid):
+        if self.editor == sid:
+            self.editor = None
+
+    def can_edit(self, sid):
+        return sid is not None and self.holder() == sid
+
+    def status(self, sid):
+        """Return status dict sent to a session."""
+        holder = self.holder()
+        return {
+            'sid'       : sid,
+            'viewers'   : len(self.sessions),
+            'editor'    : holder == sid,
+            'locked'    : holder not in (None, sid),
+            'expires_in': max(0.0, self.expires - self.clock()) if holder else 0.0,
+        }
+
+class SessionSocket(tornado.websocket.WebSocketHandler):
+    """WebSocket handler holding the session of one page."""
+
+    def initialize(self, manager, gol):
+        self.manager = manager
+        self.gol = gol
+        self.sid = None
+
+    def open(self, ):
+        """Callback for when websocket is opened."""
+        self.sid = self.manager.join()
+        self.__reply()
+
+    def on_close(self, ):
+        """Callback for when websocket is closed."""
+        self.manager.leave(self.sid)
+
+    def on_message(self, message):
+        """Handle a request from the page, see above."""
+        if isinstance(message, bytes):
+            self.__binary_edit(bytearray(message))
+            self.__reply()
+            return
+        try:
+            request = json.loads(message)
+            op = request['op']
+        except (ValueError, KeyError, TypeError):
+            return
+        if op == 'acquire':
+            self.manager.acquire(self.sid)
+        elif op == 'renew':
+            self.manager.renew(self.sid)
+        elif op == 'release':
+            self.manager.release(self.sid)
+        elif op == 'edit' and self.manager.renew(self.sid):
+            try:
+                cells = [(int(x), int(y), int(value))
+                         for x, y, value in request.get('cells', [])]
+            except (ValueError, TypeError):
+                cells = None
+            if cells:
+                self.gol.edit(cells)
+        self.__reply()
+
+    def __binary_edit(self, data):
+        """Apply a TOGGLES or BOARD edit if this session may edit."""
+        if not data or not self.manager.renew(self.sid):
+            return
+        kind = data[0]
+        if kind == TOGGLES:
+            self.gol.edit([(i & 0x0F, i >> 4, TOGGLE) for i in data[1:]])
+        elif kind == BOARD and len(data) == 33:
+            self.gol.edit_words(struct.unpack('<16H', bytes(data[1:])))
+
+    def __reply(self, ):
+        try:
+            self.write_message(json.dumps(self.manager.status(self.sid)))
+        except tornado.websocket.WebSocketClosedError:
+            pass
@@ -0,0 +1,118 @@
+#===============================================================================
+# soupsearch.py
+#
+# Headless soup search. Random universes are seeded the same way as GOL's
+# create_world(), run until they settle into a still life or oscillator using
+# the same MAX_CYCLES logic as the device, and the results are stored in the
+# STATS table of life_stats.db.
+#
+# Soups are split into chunks and run across all cores with a process pool.
+# Each soup is seeded from an int made of the search seed and its index, not
+# a tuple, whose hash differs between 32 and 64 bit Pythons, so a search can
+# be repeated exactly on any box.
+#
+#       python soupsearch.py -n 100000
+#===============================================================================
+import argparse
+import multiprocessing
+import time
+from random import Random
+
+import lifestats
+from bitlife import BitLife
+from cycledetector import CycleDetector
+
+PERCENT_FILL    = 50    # universe fill factor
+MAX_HIST        = 1000  # maximum history to track universe (longest period)
+MAX_CYCLES      = 20    # maximum cycles for oscillators
+MAX_GENS        = 10000 # give up on soups still going after this many
+CHUNK           = 200   # soups per pool task
+
+NX = 16
+NY = 16
+
+def create_world(rng, fill=PERCENT_FILL):
+    """Let there be light. Return starting universe ID."""
+    ID = 0
+    for i in xrange(int(0.01 * NX * NY * fill)):
+        x = rng.randrange(1,NX+1)
+        y = rng.randrange(1,NY+1)
+        ID |= 1 << ((x-1)*NY + (y-1))
+    return ID
+
+def run_soup(startID, life, history, max_gens=MAX_GENS):
+    """Run universe until it settles. Return (generations, period) or None."""
+    life.set_id(startID)
+    generation = 1
+    cycle_count = 0
+    history.reset(startID, generation)
+    while generation < max_gens:
+        generation += 1
+        life.step()
+        ID = life.get_id()
+        p = history.update(ID, generation)
+        if p:
+            # Let it repeat for a few cycles
+            cycle_count += 1
+            if cycle_count > MAX_CYCLES:
+                if ID == 0:
+                    p = 0
+                return generation, p
+    return None
+
+def run_chunk(args):
+    """Run soups for a range of seeds. Return list of stats records."""
+    seed, start, count, fill, max_gens = args
+    life = BitLife(NX, NY)
+    history = CycleDetector(MAX_HIST)
+    records = []
+    for n in xrange(start, start+count):
+        startID = create_world(Random(seed * 2**32 + n), fill)
+        result = run_soup(startID, life, history, max_gens)
+        if result is not None:
+            records.append((startID,) + result)
+    return count, records
+
+def search(num, processes=None, seed=0, fill=PERCENT_FILL, max_gens=MAX_GENS,
+           filename=lifestats.FILENAME, chunk=CHUNK):
+    """Run num soups and store results. Return (soups run, soups stored)."""
+    conn = lifestats.connect(filename)
+    tasks = [(seed, start, min(chunk, num-start), fill, max_gens)
+             for start in xrange(0, num, chunk)]
+    pool = multiprocessing.Pool(processes)
+    run = stored = 0
+    try:
+        for count, records in pool.imap_unordered(run_chunk, tasks):
+            lifestats.store_stats(conn, records)
+            run += count
+            stored += len(records)
+    finally:
+        pool.terminate()
+        conn.close()
+    return run, stored
+
+#--------------------------------------------------------------------
+# M A I N
+#--------------------------------------------------------------------
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Headless soup search.")
+    parser.add_argument("-n", "--num", type=int, default=10000,
+                        help="number of soups to run")
+    parser.add_argument("-j", "--processes", type=int, default=None,
+                        help="worker processes (default: all cores)")
+    parser.add_argument("-s", "--seed", type=int, default=0,
+                        help="search seed")
+    parser.add_argument("-f", "--fill", type=int, default=PERCENT_FILL,
+                        help="universe fill factor")
+    parser.add_argument("-g", "--max-gens", type=int, default=MAX_GENS,
+                        help="give up on soups running longer than this")
+    parser.add_argument("-d", "--db", default=lifestats.FILENAME,
+                        help="stats database file")
+    args = parser.parse_args()
+
+    start = time.time()
+    run, stored = search(args.num, args.processes, args.seed, args.fill,
+                         args.max_gens, args.db)
+    secs = time.time() - start
+    print "{0} soups in {1:.1f} secs, {2:.0f} soups/sec, {3} stored.".format(
+        run, secs, run / secs, stored)
\ No newline at end of file
@@ -0,0 +1,111 @@
+#===============================================================================
+# tablelife.py
+#
+# Lookup table engine for Conway's Game of Life.
+#
+# The universe is held as row words like BitLife. Cells are stepped two at a
+# time: the 3x4 window of cells around a pair, 4 bits from each of the
+# words x-1, x and x+1, makes a 12 bit index into a table giving the next
+# state of the pair. The table has 4096 entries and is built once per rule,
+# Conway's at import.
+#
+#       index bits  0-3  word x-1, cells y-1 to y+2
+#                   4-7  word x,   cells y-1 to y+2
+#                   8-11 word x+1, cells y-1 to y+2
+#       table bit 0 = next cell (x, y), bit 1 = next cell (x, y+1)
+#
+# The words, a spare set of words for the next generation and the padded
+# words are all allocated once, each step fills them in place.
+#===============================================================================
+from bitlife import uni_to_words, words_to_uni, words_to_id, id_to_words, pad_words
+from liferules import CONWAY, get_rule
+
+NX = 16
+NY = 16
+
+def build_table(rule):
+    """Return next state table for 3x4 windows, see above."""
+    next_state = rule.next_state
+    table = []
+    for index in xrange(4096):
+        cols = [(index >> shift) & 0xF for shift in (0, 4, 8)]
+        bits = [[(col >> y) & 0x01 for y in xrange(4)] for col in cols]
+        value = 0
+        for y in (1, 2):
+            N = sum(bits[0][y-1:y+2]) + sum(bits[2][y-1:y+2]) + \
+                bits[1][y-1] + bits[1][y+1]
+            value |= next_state[bits[1][y]][N] << (y-1)
+        table.append(value)
+    return table
+
+_tables = {}
+
+def get_table(rule=CONWAY):
+    """Return next state table for rule, building it only once."""
+    rule = get_rule(rule)
+    if rule.name not in _tables:
+        _tables[rule.name] = build_table(rule)
+    return _tables[rule.name]
+
+get_table()
+
+class TableLife():
+    """Lookup table Game of Life engine."""
+
+    def __init__(self, nx=NX, ny=NY, rule=CONWAY, wrap=False):
+        self.nx = nx
+        self.ny = ny
+        self.wrap = wrap
+        self.rule = get_rule(rule)
+        self.table = get_table(self.rule)
+        self.mask = (1 << ny) - 1
+        self.words = [0] * nx
+        self.spare = [0] * nx
+        self.padded = [0] * (nx+2)
+
+    def set_universe(self, uni):
+        """Set universe from (nx+2)x(ny+2) list of lists with border."""
+        self.words[:] = uni_to_words(uni, self.nx, self.ny)
+
+    def get_universe(self, ):
+        """Return universe as (nx+2)x(ny+2) list of lists with border."""
+        return words_to_uni(self.words, self.nx, self.ny)
+
+    def set_id(self, ID):
+        """Set universe from universe ID."""
+        self.words[:] = id_to_words(ID, self.nx, self.ny)
+
+    def set_words(self, words):
+        """Set universe from row words."""
+        self.words[:] = words
+
+    def get_words(self, ):
+        """Return universe as row words."""
+        return list(self.words)
+
+    def get_cell(self, x, y):
+        """Return value of cell at x, y."""
+        return (self.words[x] >> y) & 0x01
+
+    def get_id(self, ):
+        """Return unique 2**(nx*ny) bit integer value."""
+        return words_to_id(self.words, self.ny)
+
+    def step(self, ):
+        """Life goes on, into the spare words which then swap in."""
+        table = self.table
+        ys = xrange(0, self.ny, 2)
+        padded = pad_words(self.words, self.ny, self.wrap, self.padded)
+        new = self.spare
+        for x in xrange(self.nx):
+            a, b, c = padded[x], padded[x+1], padded[x+2]
+            if not (a or b or c or table[0]):
+                new[x] = 0
+                continue
+            word = 0
+            for y in ys:
+                index = ((a >> y) & 0xF) | (((b >> y) & 0xF) << 4) | \
+                        (((c >> y) & 0xF) << 8)
+                word |= table[index] << y
+            new[x] = word & self.mask
+        self.words, self.spare = new, self.words
\ No newline at end of file
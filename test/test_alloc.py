@@ -0,0 +1,101 @@
+#===============================================================================
+# test_alloc.py
+#
+# Checks that the engines with preallocated buffers keep them, and that their
+# steady state step loop leaves no new objects behind.
+#
+# py2.7 has no tracemalloc, so this counts what it can:
+#
+#   * the buffers are the same objects, of the same size, after stepping
+#   * with gc off, gc.get_objects() is no longer after stepping, i.e. no
+#     lists, tuples, dicts or instances outlive a step
+#
+# Python ints are immutable, so each step still makes new ints and longs for
+# the row words, neighbor sums and the universe ID, and xrange objects for
+# its loops, and ListLife with wrap new bytearrays for the border slices.
+# Those are expected, and are not tracked by gc, so are not counted here.
+#
+# A glider on a 16x16 torus repeats every 64 generations, so after warming
+# up every TileLife lookup is a hit, and its cache no longer grows either.
+#===============================================================================
+import gc
+import sys
+
+import pytest
+
+from listlife import ListLife
+from tablelife import TableLife
+from lifecache import TileLife
+
+try:
+    from numpylife import NumpyLife
+except ImportError:
+    NumpyLife = None
+
+NX = 16
+NY = 16
+WARM = 128      # steps before counting, two glider periods
+STEPS = 256
+
+def glider():
+    """Return bordered universe with a glider in it."""
+    uni = [[0] * (NY+2) for x in xrange(NX+2)]
+    for x, y in ((1, 2), (2, 3), (3, 1), (3, 2), (3, 3)):
+        uni[x+1][y+1] = 1
+    return uni
+
+def buffers(engine):
+    """Return the preallocated buffers of engine."""
+    if isinstance(engine, ListLife):
+        return [engine.U, engine.UU] + engine.U + engine.UU
+    if isinstance(engine, TableLife):
+        return [engine.words, engine.spare, engine.padded]
+    if isinstance(engine, TileLife):
+        return [engine.words, engine.padded]
+    s = engine.stepper
+    return [engine.state, engine.spare, s.padded, s.rows, s.N, s.t, s.u]
+
+def snapshot(engine):
+    """Return ids and sizes of the buffers, in no order as some swap."""
+    return sorted((id(b), sys.getsizeof(b)) for b in buffers(engine))
+
+def count_objects(engine, steps):
+    """Return gc tracked objects before and after steps."""
+    gc.collect()
+    before = len(gc.get_objects())
+    for n in xrange(steps):
+        engine.step()
+    after = len(gc.get_objects())
+    return before, after
+
+ENGINES = [ListLife, TableLife, TileLife]
+if NumpyLife:
+    ENGINES.append(NumpyLife)
+
+@pytest.mark.parametrize('engine_class', ENGINES)
+@pytest.mark.parametrize('wrap', [False, True])
+def test_steady_state_step(engine_class, wrap):
+    engine = engine_class(NX, NY, wrap=wrap)
+    engine.set_universe(glider())
+    for n in xrange(WARM):
+        engine.step()
+    buffers_before = snapshot(engine)
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        before, after = count_objects(engine, STEPS)
+    finally:
+        if enabled:
+            gc.enable()
+    assert snapshot(engine) == buffers_before
+    assert after <= before
+
+def test_tile_cache_warm():
+    engine = TileLife(NX, NY, wrap=True)
+    engine.set_universe(glider())
+    for n in xrange(WARM):
+        engine.step()
+    misses = engine.cache.misses
+    for n in xrange(STEPS):
+        engine.step()
+    assert engine.cache.misses == misses
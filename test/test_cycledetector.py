@@ -0,0 +1,47 @@
+#===============================================================================
+# test_cycledetector.py
+#
+# Period and transient from CycleDetector on made up universe ID streams.
+#===============================================================================
+from cycledetector import CycleDetector
+
+def feed(detector, ids, start=1):
+    """Update detector with ids from generation start on. Return periods."""
+    return [detector.update(ID, start + n) for n, ID in enumerate(ids)]
+
+def test_still_life():
+    d = CycleDetector()
+    d.reset(7, 1)
+    assert feed(d, [7, 7], start=2) == [1, 1]
+    assert d.period == 1
+    assert d.transient == 0
+
+def test_period_and_transient():
+    d = CycleDetector()
+    d.reset(10, 1)
+    # generations 1 and 2 lead into a cycle of 3 entered at generation 3
+    assert feed(d, [11, 1, 2, 3, 1, 2], start=2) == [0, 0, 0, 0, 3, 3]
+    assert d.period == 3
+    assert d.transient == 2
+
+def test_first_period_kept():
+    d = CycleDetector()
+    d.reset(1, 1)
+    feed(d, [2, 1, 2, 3, 3], start=2)
+    assert d.period == 2
+
+def test_max_period():
+    d = CycleDetector(max_period=2)
+    d.reset(1, 1)
+    assert feed(d, [2, 3, 1, 2, 3], start=2) == [0] * 5
+    assert d.period == 0
+
+def test_reset():
+    d = CycleDetector()
+    d.reset(1, 1)
+    feed(d, [2, 1], start=2)
+    d.reset(5, 10)
+    assert d.period == 0
+    assert d.update(1, 11) == 0
+    assert d.update(5, 12) == 2
+    assert d.transient == 0
@@ -0,0 +1,82 @@
+#===============================================================================
+# test_engines.py
+#
+# Every engine in gol.ENGINES against ListLife, the reference, on random
+# soups over several board sizes and rules, with and without wrap.
+#
+# HashLife runs on an unbounded plane and can't wrap, so it only gets small
+# soups in the middle of the board, stepped too few generations to reach
+# the edge.
+#===============================================================================
+from random import Random
+
+import pytest
+
+from gol import ENGINES
+from listlife import ListLife
+from lifecache import TILE
+
+SIZES = [(16, 16), (8, 12), (20, 8), (7, 11)]
+RULES = ['B3/S23', 'highlife', 'daynight', 'seeds', 'B1357/S1357']
+SOUPS = 5           # soups per case
+GENS = 40           # generations per soup
+FILL = 0.5
+
+def random_uni(rand, nx, ny, box=None):
+    """Return bordered universe with random cells, only inside box
+    (x0, y0, x1, y1) if given."""
+    x0, y0, x1, y1 = box or (0, 0, nx, ny)
+    uni = [[0] * (ny+2) for x in xrange(nx+2)]
+    for x in xrange(x0, x1):
+        for y in xrange(y0, y1):
+            uni[x+1][y+1] = int(rand.random() < FILL)
+    return uni
+
+def check(name, nx, ny, rule, wrap, gens, box=None):
+    """Step soups with engine name and ListLife, comparing every generation."""
+    rand = Random(nx*1000 + ny)
+    for soup in xrange(SOUPS):
+        uni = random_uni(rand, nx, ny, box)
+        ref = ListLife(nx, ny, rule=rule, wrap=wrap)
+        engine = ENGINES[name](nx, ny, rule=rule, wrap=wrap)
+        ref.set_universe(uni)
+        engine.set_universe(uni)
+        for gen in xrange(gens):
+            assert engine.get_id() == ref.get_id(), (soup, gen)
+            ref.step()
+            engine.step()
+        assert engine.get_id() == ref.get_id(), (soup, gens)
+        assert engine.get_universe() == ref.get_universe()
+        x, y = nx // 2, ny // 2
+        assert engine.get_cell(x, y) == ref.get_cell(x, y)
+
+BOUNDED = sorted(name for name in ENGINES if name != 'hash')
+
+@pytest.mark.parametrize('name', BOUNDED)
+@pytest.mark.parametrize('nx,ny', SIZES)
+@pytest.mark.parametrize('rule', RULES)
+@pytest.mark.parametrize('wrap', [False, True])
+def test_engine_matches_list(name, nx, ny, rule, wrap):
+    if name == 'tile' and (nx % TILE or ny % TILE):
+        pytest.skip("board size not a multiple of the tile size")
+    check(name, nx, ny, rule, wrap, GENS)
+
+@pytest.mark.parametrize('rule', RULES)
+def test_hash_interior(rule):
+    # a 6x6 soup in the middle of 32x32, growing at most a cell a generation
+    check('hash', 32, 32, rule, False, 8, box=(13, 13, 19, 19))
+
+def test_hash_rejects_wrap():
+    with pytest.raises(ValueError):
+        ENGINES['hash'](16, 16, wrap=True)
+
+@pytest.mark.parametrize('name', sorted(ENGINES))
+def test_set_id(name):
+    rand = Random(1)
+    ID = rand.getrandbits(16*16)
+    engine = ENGINES[name](16, 16)
+    engine.set_id(ID)
+    assert engine.get_id() == ID
+    ref = ListLife(16, 16)
+    ref.set_id(ID)
+    assert engine.get_universe() == ref.get_universe()
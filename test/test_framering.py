@@ -0,0 +1,73 @@
+#===============================================================================
+# test_framering.py
+#
+# FrameRing order, epochs and wakes, mostly from a single thread, as each
+# call that would wait returns at once when it has what it waits for.
+#===============================================================================
+import threading
+
+from framering import FrameRing
+
+def test_fifo():
+    ring = FrameRing(4)
+    for n in xrange(3):
+        assert ring.put(n, ring.epoch)
+    assert ring.peek() == 0
+    assert [ring.get() for n in xrange(3)] == [0, 1, 2]
+    assert ring.peek() is None
+
+def test_clear_drops_stale_put():
+    ring = FrameRing(4)
+    epoch = ring.epoch
+    assert ring.put('old', epoch)
+    ring.clear()
+    assert ring.peek() is None
+    assert not ring.put('stale', epoch)
+    assert ring.peek() is None
+    assert ring.put('new', ring.epoch)
+    assert ring.get() == 'new'
+
+def test_wait_room():
+    ring = FrameRing(2)
+    assert ring.wait_room()
+    ring.put(1, ring.epoch)
+    ring.put(2, ring.epoch)
+    ring.wake()
+    assert not ring.wait_room()     # full, so only the wake ends the wait
+    ring.get()
+    assert ring.wait_room()
+
+def test_wake_kept_for_consumer():
+    ring = FrameRing(2)
+    ring.wake()
+    assert ring.get() is None       # empty, so only the wake ends the wait
+    ring.put(1, ring.epoch)
+    assert ring.get() == 1
+
+def test_wake_kept_for_producer():
+    ring = FrameRing(2)
+    ring.wake()
+    ring.idle(60)                   # returns at once on the kept wake
+    ring.put(1, ring.epoch)
+    ring.put(2, ring.epoch)
+    ring.wake()
+    assert not ring.wait_room()
+
+def test_wake_blocked_consumer():
+    ring = FrameRing(2)
+    got = []
+    consumer = threading.Thread(target=lambda: got.append(ring.get()))
+    consumer.start()
+    ring.wake()
+    consumer.join(5)
+    assert not consumer.is_alive()
+    assert got == [None]
+
+def test_put_wakes_consumer():
+    ring = FrameRing(2)
+    got = []
+    consumer = threading.Thread(target=lambda: got.append(ring.get()))
+    consumer.start()
+    ring.put('frame', ring.epoch)
+    consumer.join(5)
+    assert got == ['frame']
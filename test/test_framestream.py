@@ -0,0 +1,56 @@
+#===============================================================================
+# test_framestream.py
+#
+# Frame encoding for the browser stream.
+#===============================================================================
+import struct
+
+import pytest
+
+from framestream import KEY, DELTA, WORDS, encode_frame, frame_words
+
+WORDS0 = [0x1111 * (x % 4) for x in xrange(WORDS)]
+
+def changed(words, xs):
+    """Return copy of words with words xs flipped."""
+    words = list(words)
+    for x in xs:
+        words[x] ^= 0xFFFF
+    return words
+
+def test_key():
+    msg = encode_frame(7, WORDS0)
+    assert len(msg) == 37
+    assert struct.unpack('<BI16H', msg) == (KEY, 7) + tuple(WORDS0)
+
+def test_delta_mask_layout():
+    words = changed(WORDS0, [0, 3, 15])
+    msg = encode_frame(8, words, WORDS0)
+    assert len(msg) == 7 + 2*3
+    kind, generation, mask, w0, w3, w15 = struct.unpack('<BIH3H', msg)
+    assert (kind, generation) == (DELTA, 8)
+    assert mask == 1 | 1 << 3 | 1 << 15
+    assert (w0, w3, w15) == (words[0], words[3], words[15])
+
+def test_delta_unchanged():
+    assert encode_frame(9, WORDS0, WORDS0) == struct.pack('<BIH', DELTA, 9, 0)
+
+@pytest.mark.parametrize('n,kind', [(1, DELTA), (WORDS - 2, DELTA),
+                                    (WORDS - 1, KEY), (WORDS, KEY)])
+def test_key_threshold(n, kind):
+    # a delta of 15 words is as long as a key frame, so a key is sent
+    msg = encode_frame(1, changed(WORDS0, range(n)), WORDS0)
+    assert ord(msg[0]) == kind
+    assert len(msg) == (7 + 2*n if kind == DELTA else 37)
+
+def test_generation_wraps():
+    msg = encode_frame(1 << 32 | 5, WORDS0)
+    assert struct.unpack_from('<I', msg, 1) == (5,)
+
+def test_frame_words():
+    ID = sum(word << (16*x) for x, word in enumerate(WORDS0))
+    assert frame_words(ID) == WORDS0
+    assert frame_words(tuple(WORDS0)) == WORDS0
+    raw = struct.pack('<16H', *WORDS0)
+    assert frame_words(raw) == WORDS0
+    assert frame_words(bytearray(raw)) == WORDS0
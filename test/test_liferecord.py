@@ -0,0 +1,88 @@
+#===============================================================================
+# test_liferecord.py
+#
+# Recordings written by Recorder read back, seeked and replayed.
+#===============================================================================
+import struct
+
+import pytest
+
+from liferecord import FRAME, Recorder, Recording, frame_bytes, replay
+
+def frames():
+    """Return (generation, frame) of two universes, IDs then row words."""
+    shown = [(g, g * 0x0101) for g in xrange(1, 6)]
+    shown += [(g, [g] * 16) for g in xrange(1, 4)]
+    return shown
+
+def record(filename, shown, close=True):
+    recorder = Recorder(filename)
+    for generation, frame in shown:
+        recorder.record(generation, frame)
+    if close:
+        recorder.close()
+    else:
+        recorder.file.flush()
+    return recorder
+
+def test_frame_bytes():
+    assert frame_bytes(0x0201) == '\x01\x02' + '\x00' * 30
+    words = range(16)
+    assert frame_bytes(words) == struct.pack('<16H', *words)
+    raw = frame_bytes(words)
+    assert frame_bytes(raw) == raw
+    assert frame_bytes(bytearray(raw)) == raw
+    assert len(frame_bytes(1 << 255)) == FRAME
+
+def test_round_trip(tmpdir):
+    filename = str(tmpdir.join('run.rec'))
+    shown = frames()
+    record(filename, shown)
+    rec = Recording(filename)
+    try:
+        assert len(rec) == len(shown)
+        assert rec.keyframes == [(0, 1), (5, 1)]
+        for n, (generation, frame) in enumerate(shown):
+            assert rec.frame(n) == frame_bytes(frame)
+            assert rec.generation(n) == generation
+        with pytest.raises(IndexError):
+            rec.frame(len(shown))
+    finally:
+        rec.close()
+
+def test_seek(tmpdir):
+    filename = str(tmpdir.join('run.rec'))
+    shown = frames()
+    record(filename, shown)
+    rec = Recording(filename)
+    try:
+        assert rec.next_keyframe(0) == 5
+        assert rec.next_keyframe(4) == 5
+        assert rec.next_keyframe(5) is None
+        got = []
+        replay(rec, lambda generation, frame: got.append((generation, frame)),
+               rate=0, start=6, stop=100)
+        assert got == [(g, frame_bytes(f)) for g, f in shown[6:]]
+    finally:
+        rec.close()
+
+def test_not_closed(tmpdir):
+    filename = str(tmpdir.join('run.rec'))
+    shown = frames()
+    recorder = record(filename, shown, close=False)
+    rec = Recording(filename)
+    try:
+        assert len(rec) == len(shown)
+        assert rec.keyframes == []
+        assert rec.generation(6) == 7
+        assert rec.frame(6) == frame_bytes(shown[6][1])
+    finally:
+        rec.close()
+        recorder.close()
+
+def test_not_a_recording(tmpdir):
+    filename = str(tmpdir.join('bad.rec'))
+    with open(filename, 'wb') as f:
+        f.write('x' * 64)
+    with pytest.raises(ValueError):
+        Recording(filename)
@@ -0,0 +1,55 @@
+#===============================================================================
+# test_liferules.py
+#
+# Rulestring parsing, and the compiled bit logic against the rule tables.
+#===============================================================================
+import pytest
+
+from liferules import CONWAY, RULES, parse_rule, compile_bitlogic, get_rule
+
+@pytest.mark.parametrize('rulestring', ['B3/S23', 'S23/B3', '23/3', 'b3/s23',
+                                        'B3 / S23', 'conway', 'Life'])
+def test_parse_conway(rulestring):
+    assert parse_rule(rulestring) == (frozenset([3]), frozenset([2, 3]))
+
+def test_parse_empty_sets():
+    assert parse_rule('B2/S') == (frozenset([2]), frozenset())
+    assert parse_rule('seeds') == (frozenset([2]), frozenset())
+    assert parse_rule('B/S012345678') == (frozenset(), frozenset(range(9)))
+
+@pytest.mark.parametrize('rulestring', ['', 'B9/S23', 'B3S23', 'X3/S23', 'nope'])
+def test_parse_bad(rulestring):
+    with pytest.raises(ValueError):
+        parse_rule(rulestring)
+
+RULESTRINGS = sorted(RULES.values()) + ['B/S', 'B0/S8', 'B012345678/S012345678']
+
+@pytest.mark.parametrize('rulestring', RULESTRINGS)
+def test_bitlogic_matches_table(rulestring):
+    birth, survive = parse_rule(rulestring)
+    bitlogic = compile_bitlogic(birth, survive)
+    for alive in (0, 1):
+        for N in xrange(9):
+            z0, h0, h1, h2 = N & 1, (N >> 1) & 1, (N >> 2) & 1, (N >> 3) & 1
+            want = N in (survive if alive else birth)
+            assert bitlogic(alive, z0, h0, h1, h2) & 1 == want, (alive, N)
+
+def test_bitlogic_bit_parallel():
+    # one cell per bit, every (alive, N) at once
+    birth, survive = parse_rule('highlife')
+    b = z0 = h0 = h1 = h2 = 0
+    for i, (alive, N) in enumerate((a, n) for a in (0, 1) for n in xrange(9)):
+        b |= alive << i
+        z0 |= (N & 1) << i
+        h0 |= ((N >> 1) & 1) << i
+        h1 |= ((N >> 2) & 1) << i
+        h2 |= ((N >> 3) & 1) << i
+    out = compile_bitlogic(birth, survive)(b, z0, h0, h1, h2)
+    rule = get_rule('highlife')
+    for i, (alive, N) in enumerate((a, n) for a in (0, 1) for n in xrange(9)):
+        assert (out >> i) & 1 == rule.next(alive, N)
+
+def test_get_rule_cached():
+    assert get_rule('conway') is get_rule(CONWAY)
+    assert get_rule(get_rule(CONWAY)) is get_rule(CONWAY)
+    assert get_rule('23/3').name == 'B3/S23'
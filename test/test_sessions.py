@@ -0,0 +1,82 @@
+#===============================================================================
+# test_sessions.py
+#
+# SessionManager's editor lease, on a clock the tests move by hand.
+#===============================================================================
+from sessions import SessionManager
+
+LEASE = 30.0
+
+class Clock():
+    """Clock to set by hand."""
+
+    def __init__(self, ):
+        self.now = 1000.0
+
+    def __call__(self, ):
+        return self.now
+
+def manager():
+    clock = Clock()
+    return SessionManager(lease=LEASE, clock=clock), clock
+
+def test_acquire_conflict():
+    m, clock = manager()
+    a, b = m.join(), m.join()
+    assert m.acquire(a)
+    assert not m.acquire(b)
+    assert m.holder() == a
+    assert m.can_edit(a) and not m.can_edit(b)
+    assert m.status(b)['locked'] and not m.status(b)['editor']
+    assert m.status(a)['editor'] and not m.status(a)['locked']
+
+def test_acquire_unknown_session():
+    m, clock = manager()
+    assert not m.acquire('nobody')
+    assert m.holder() is None
+
+def test_expiry_handoff():
+    m, clock = manager()
+    a, b = m.join(), m.join()
+    assert m.acquire(a)
+    clock.now += LEASE - 1
+    assert not m.acquire(b)
+    assert m.status(b)['expires_in'] == 1.0
+    clock.now += 1
+    assert m.holder() is None
+    assert not m.can_edit(a)
+    assert m.acquire(b)
+    assert m.holder() == b
+    assert not m.renew(a)
+
+def test_renew():
+    m, clock = manager()
+    a, b = m.join(), m.join()
+    assert not m.renew(a)
+    assert m.holder() is None
+    assert m.acquire(a)
+    assert not m.renew(b)
+    assert m.holder() == a
+    clock.now += LEASE - 1
+    assert m.renew(a)
+    clock.now += LEASE - 1
+    assert m.holder() == a
+
+def test_release():
+    m, clock = manager()
+    a, b = m.join(), m.join()
+    assert m.acquire(a)
+    m.release(b)
+    assert m.holder() == a
+    m.release(a)
+    assert m.acquire(b)
+
+def test_leave_releases():
+    m, clock = manager()
+    a, b = m.join(), m.join()
+    assert m.acquire(a)
+    m.leave(a)
+    assert m.holder() is None
+    assert m.status(b)['viewers'] == 1
+    assert not m.acquire(a)
+    assert m.acquire(b)
@@ -4,7 +4,19 @@
 # Web interface for controlling 16x16 LED matrix.
 #
 # Uses Tornado to create web frame work for serving content. Matrix is
-# comprised of two Adafruit 8x16 LED matrix displays.
+# comprised of two Adafruit 8x16 LED matrix displays. The running universe
+# is streamed live to any number of browsers on /ws_frames, see framestream.
+# One browser at a time may edit, see sessions. Frame timings and counters
+# are served as JSON on /metrics and logged every LOG_EVERY secs, see
+# lifemetrics. Set METRICS to False to turn them off.
+#
+# GOL is run on the IOLoop by golruntime, with display writes on an executor.
+# Set THREADED to True to run it as its own thread instead, making AHEAD
+# generations before they are shown.
+#
+# Set RECORD to a file name to record every frame shown, and REPLAY to a
+# recording to show it on the matrix and to the browsers instead of running
+# GOL, see liferecord.
 #
 # 16x16 LED Matrix Configuration
 #
@@ -20,20 +32,38 @@
 #===============================================================================
 import os
 import json
+import threading
 
 import tornado.httpserver
+import tornado.ioloop
 import tornado.web
 import tornado.websocket
 
-import Matrix16x16
-import GOL
+from gol import GOL
+from golruntime import LifeRuntime
+from framestream import FrameStream, FrameSocket
+from sessions import SessionManager, SessionSocket
+from lifemetrics import Metrics
+from liferecord import Recorder, Recording, replay
 
 ROOT_DIR = os.getcwd()
 PORT = 80
+METRICS = True
+LOG_EVERY = 600     # secs between metrics log lines, 0 for none
+THREADED = False    # run GOL as a thread instead of on the IOLoop
+AHEAD = 16          # generations made before they are shown, if THREADED
+RECORD = None       # file to record frames shown to
+REPLAY = None       # recording to show instead of running GOL
 
-m = Matrix16x16.Matrix16x16()
-gol = GOL.GOL()
-someoneConnected = False
+metrics = Metrics(log_every=LOG_EVERY) if METRICS else None
+gol = GOL(metrics=metrics, ahead=AHEAD if THREADED else 0)
+life = gol if THREADED else LifeRuntime(gol, tornado.ioloop.IOLoop.current())
+stream = FrameStream(tornado.ioloop.IOLoop.current())
+gol.add_frame_listener(stream.publish)
+recorder = Recorder(RECORD) if RECORD else None
+if recorder:
+    gol.add_frame_listener(recorder.record)
+sessions = SessionManager()
 
 NX = 16
 NY = 16
@@ -44,84 +74,44 @@ class MainHandler(tornado.web.RequestHandler):
    
     def get(self, ):
         print "Main handler."
-        if someoneConnected:
-            self.render("404.html")
-        else:
-            gol.pause()
-            self.render("web16x16.html")
+        self.render("web16x16.html")
 
-class WSCounterHandler(tornado.websocket.WebSocketHandler):
-    """Handle the websocket connection for monitoring user connectedness."""
-    
-    def open(self,):
-        """Callback for when websocket is opened."""
-        global someoneConnected
-        someoneConnected = True
-        
-    def on_close(self, ):
-        """Callback for when websocket is closed."""
-        global someoneConnected
-        someoneConnected = False
-        gol.restart()
-        
-class AjaxDisplayHandler(tornado.web.RequestHandler):
-    """Handle grid display button clicks."""
-    
-    def post(self, ):
-        # OLD
-        #json_data = json.loads(self.request.body)
-        #print("Button click handler: {0}".format(json_data))
-        #state = self.__handleClick(json_data)
-        #resp = {'state': state}
-        """Receive button click ID. Toggle corresponding cell. Return modified universe."""
-        json_data = json.loads(self.request.body)
-        resp = {}
-        resp['uni'] = self.__toggleCell(json_data['id'])
-        resp = {}
-        self.write(json.dumps(resp))
-        
-    def __toggleCell(self, cellID):
-        val = int(json_data['id'],0)
-        x = val % 16
-        y = val / 16
-        
-    
-        
-    def __handleClick(self, json_data):
-        val = int(json_data['id'],0)
-        x = val % 16
-        y = val / 16
-        state = not json_data['state']
-        #print("val={0},x={1},y={2},state={3}".format(val,x,y,state))
-        m.set_pixel(x,y, state)
-        m.write_display()
-        return state
-    
 class AjaxRunHandler(tornado.web.RequestHandler):
     """Handle RUN button."""
     
     def post(self, ):
         json_data = json.loads(self.request.body)
+        if not sessions.renew(json_data.get('sid')):
+            raise tornado.web.HTTPError(403)
         json_uni = json_data['uni']
-        U = [[0 for x in xrange(18)] for y in xrange(18)]
-        for y in xrange(16):
+        U = [[0 for y in xrange(NY)] for x in xrange(NX)]
+        for y in xrange(NY):
             rowByte = json_uni['{0}'.format(y)]
-            for x in xrange(16):
-                U[1+15-x][1+y] = rowByte & 0x01
+            for x in xrange(NX):
+                U[15-x][y] = rowByte & 0x01
                 rowByte >>= 1
-        gol.runUniverse(U)
+        life.set_universe(U)
         resp = {'':''}
         self.write(json.dumps(resp))
 
+class MetricsHandler(tornado.web.RequestHandler):
+    """Serve frame timings and counters."""
+
+    def get(self, ):
+        if not metrics:
+            raise tornado.web.HTTPError(404)
+        self.write(metrics.snapshot())
+
 class MainServerApp(tornado.web.Application):
     """Main Server application."""
     
     def __init__(self):
         handlers = [
             (r"/",                  MainHandler),
-            (r"/ajax_display",      AjaxDisplayHandler),
             (r"/ajax_run",          AjaxRunHandler),
-            (r"/ws_counter",        WSCounterHandler),
+            (r"/metrics",           MetricsHandler),
+            (r"/ws_session",        SessionSocket, dict(manager=sessions, gol=life)),
+            (r"/ws_frames",         FrameSocket, dict(stream=stream)),
         ]
         
         settings = {
@@ -135,11 +125,28 @@ class MainServerApp(tornado.web.Application):
 # M A I N 
 #--------------------------------------------------------------------
 if __name__ == '__main__':
+    stopped = threading.Event()
     try:
-        gol.start()
+        if REPLAY:
+            player = threading.Thread(target=replay, name="Replay",
+                                      args=(Recording(REPLAY), gol.show),
+                                      kwargs=dict(stopped=stopped))
+            player.daemon = True
+            player.start()
+        else:
+            life.start()
         tornado.httpserver.HTTPServer(MainServerApp()).listen(PORT)
         print "Server started on port {0}.".format(PORT)
         tornado.ioloop.IOLoop.instance().start()
     except KeyboardInterrupt:
-        gol.kill()
-        gol.join()
\ No newline at end of file
+        if REPLAY:
+            stopped.set()
+            player.join()
+        elif THREADED:
+            gol.kill()
+            gol.join()
+        else:
+            life.stop()
+    finally:
+        if recorder:
+            recorder.close()
\ No newline at end of file